@@ -0,0 +1,68 @@
+"""Fixed-depth benchmark for the chess bot search.
+
+Runs every position in POSITIONS to a fixed depth and reports the time
+taken and nodes searched, so changes to the search can be compared on
+equal footing.
+
+Usage:
+    python bench.py [--depth 3] [--threads 4]
+
+With --threads N the single-process search is compared against the
+root-splitting parallel search with N workers.
+"""
+import argparse
+import time
+
+import chess
+
+from chess_bot import ChessBot
+
+POSITIONS = [
+    chess.STARTING_FEN,
+    "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4",
+    "rnbqkb1r/pp1p1ppp/4pn2/2p5/2PP4/2N5/PP2PPPP/R1BQKBNR w KQkq - 0 4",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1",
+]
+
+# Large enough that only the depth limit ends a search
+NO_TIME_LIMIT = 10 ** 6
+
+
+def run(depth, threads=1, parallel='lazy_smp'):
+    """Search every position to depth; return (total_seconds, total_nodes, best_moves)."""
+    total = 0.0
+    nodes = 0
+    moves = []
+    bot = ChessBot()
+    try:
+        for fen in POSITIONS:
+            bot.board = chess.Board(fen)
+            bot.transposition_table.clear()
+            start = time.perf_counter()
+            moves.append(bot.iterative_deepening(depth, NO_TIME_LIMIT, threads, parallel))
+            total += time.perf_counter() - start
+            nodes += bot.nodes
+    finally:
+        bot.close()
+    return total, nodes, moves
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+
+    base_time, base_nodes, base_moves = run(args.depth)
+    print(f"single process: {base_time:.2f}s  {base_nodes} nodes  {base_nodes / base_time:.0f} nps  "
+          f"{' '.join(map(str, base_moves))}")
+
+    if args.threads > 1:
+        split_time, _, split_moves = run(args.depth, args.threads, 'root_split')
+        print(f"root split x{args.threads}: {split_time:.2f}s  {' '.join(map(str, split_moves))}")
+        print(f"speedup: {base_time / split_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,355 @@
 import chess
+import chess.polyglot
 import random, time
+import math
+import mmap
+import multiprocessing
+import os
+import queue
+import struct
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+# Bump ENGINE_VERSION when the search changes what it stores in the TT and
+# EVAL_VERSION whenever evaluate() scores change; TT snapshots written by
+# another version are rejected on load.
+ENGINE_VERSION = 5
+EVAL_VERSION = 1
+
+# Search scores for terminal positions (side-to-move relative). Being mated
+# ply plies from the root scores -(MATE_SCORE - ply), so shorter mates score
+# further from zero; any score beyond MATE_BOUND either way is a mate score.
+MATE_SCORE = 100000
+MATE_BOUND = MATE_SCORE - 1000
+DRAW_SCORE = 0
+
+# Null-move pruning: tried from NULL_MOVE_MIN_DEPTH with the null search
+# reduced by NULL_MOVE_REDUCTION plies (one more from NULL_MOVE_VERIFY_DEPTH,
+# where a null-move cutoff is also confirmed by a reduced real search). Never
+# at the root, in check, without non-pawn material or right after a null move.
+NULL_MOVE_MIN_DEPTH = 3
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_VERIFY_DEPTH = 6
+
+# Late move reductions: quiet moves after the first LMR_MIN_MOVES at depth
+# LMR_MIN_DEPTH or more are searched LMR_REDUCTIONS[depth][move_number]
+# plies shallower, growing with the log of both (capped at LMR_TABLE_SIZE).
+# Checks, the killers and the TT move are never reduced, nor is anything in check.
+LMR_MIN_DEPTH = 3
+LMR_MIN_MOVES = 3
+LMR_TABLE_SIZE = 64
+LMR_REDUCTIONS = [[0] * LMR_TABLE_SIZE] + [
+    [0] + [int(0.75 + math.log(depth) * math.log(move_number) / 2.25) for move_number in range(1, LMR_TABLE_SIZE)]
+    for depth in range(1, LMR_TABLE_SIZE)]
+
+# Frontier pruning margins on the evaluate() scale, where a quiet move
+# rarely shifts the score by more than 30. Reverse futility pruning returns
+# at depth <= PRUNING_MAX_DEPTH when the static eval beats beta by
+# REVERSE_FUTILITY_MARGIN per ply (one ply fewer when the eval is higher than
+# two plies earlier, i.e. improving); futility pruning skips quiet moves when
+# it trails alpha by FUTILITY_MARGIN per ply; razoring drops to quiescence
+# at depth <= len(RAZOR_MARGINS) - 1 when it trails alpha by RAZOR_MARGINS[depth].
+PRUNING_MAX_DEPTH = 3
+REVERSE_FUTILITY_MARGIN = 50
+FUTILITY_MARGIN = 50
+RAZOR_MARGINS = (0, 150, 250)
+
+# Late move pruning: at depth d < len(LATE_MOVE_COUNTS), out of check, once
+# LATE_MOVE_COUNTS[d] moves have been searched the remaining quiet moves,
+# which come last in history order, are skipped
+LATE_MOVE_COUNTS = (0, 5, 8, 13)
+
+# ProbCut: from PROBCUT_MIN_DEPTH, a capture that beats beta by
+# PROBCUT_MARGIN in a search PROBCUT_REDUCTION plies shallower cuts the node
+PROBCUT_MIN_DEPTH = 5
+PROBCUT_REDUCTION = 4
+PROBCUT_MARGIN = 100
+
+# Multi-cut: from MULTICUT_MIN_DEPTH, if MULTICUT_CUTOFFS of the first
+# MULTICUT_MOVES moves fail high in a search MULTICUT_REDUCTION plies
+# shallower, the node is cut
+MULTICUT_MIN_DEPTH = 6
+MULTICUT_REDUCTION = 3
+MULTICUT_MOVES = 6
+MULTICUT_CUTOFFS = 3
+
+# Aspiration windows: each iteration first searches within
+# ASPIRATION_WINDOW (on the evaluate() scale) of the previous score, and
+# the failing side of the window is doubled on every fail until it is
+# wider than ASPIRATION_MAX_WINDOW, when that side is opened fully
+ASPIRATION_WINDOW = 25
+ASPIRATION_MAX_WINDOW = 400
+
+# Lazy SMP: once the main search raises the stop flag, helper results are
+# awaited for at most HELPER_STOP_TIMEOUT seconds; helpers that died or are
+# still running by then are ignored and the main process's move is kept
+HELPER_STOP_TIMEOUT = 2.0
+
+# Transposition table depth of quiescence results. Such entries are only
+# stored where they would not replace a deeper search's entry.
+QSEARCH_DEPTH = 0
+
+# Delta pruning slack on the evaluate() scale: the most a capture is
+# expected to shift the pawn-structure terms on top of the material it wins
+DELTA_MARGIN = 200
+
+def _passed_pawn_mask(square, color):
+    """Squares on the pawn's file and adjacent files ahead of it."""
+    file_index, rank_index = square & 7, square >> 3
+    ranks = range(rank_index + 1, 8) if color else range(rank_index)
+    mask = 0
+    for rank in ranks:
+        for file in (file_index - 1, file_index, file_index + 1):
+            if 0 <= file < 8:
+                mask |= chess.BB_SQUARES[rank * 8 + file]
+    return mask
+
+
+def _king_shield_masks(square, color):
+    """(mask, score) per file around the king: shield squares on the file and their bonus."""
+    king_pawn_shield_scores = [4, 7, 4, 3, 6, 3]
+    file_index, rank_index = square & 7, square >> 3
+    ranks = range(rank_index, min(8, rank_index + 2)) if color else range(max(0, rank_index - 1), rank_index + 1)
+    masks = []
+    for file in range(max(0, file_index - 1), min(8, file_index + 2)):
+        mask = 0
+        for rank in ranks:
+            mask |= chess.BB_SQUARES[rank * 8 + file]
+        masks.append((mask, king_pawn_shield_scores[min(5, file)]))
+    return tuple(masks)
+
+
+# Evaluation masks, indexed [color][square] (or [file]) and built once at import
+PASSED_PAWN_MASKS = [[_passed_pawn_mask(sq, color) for sq in chess.SQUARES] for color in (chess.BLACK, chess.WHITE)]
+ADJACENT_FILE_MASKS = [
+    (chess.BB_FILES[file - 1] if file > 0 else 0) | (chess.BB_FILES[file + 1] if file < 7 else 0)
+    for file in range(8)
+]
+KING_SHIELD_MASKS = [[_king_shield_masks(sq, color) for sq in chess.SQUARES] for color in (chess.BLACK, chess.WHITE)]
+
+
+def encode_move(move):
+    """Pack a move into 16 bits (from, to, promotion); 0 means no move."""
+    if move is None:
+        return 0
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def decode_move(code):
+    """Inverse of encode_move(); returns None for 0."""
+    if not code:
+        return None
+    return chess.Move(code & 0x3F, (code >> 6) & 0x3F, (code >> 12) or None)
+
+
+def _pow2_floor(n):
+    """Largest power of two <= n (at least 1), so a table index is a simple mask."""
+    return 1 << (max(1, n).bit_length() - 1)
+
+
+def _score_to_tt(score, ply):
+    """Make a mate score count from the node being stored instead of the root."""
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def _score_from_tt(score, ply):
+    """Inverse of _score_to_tt() for a node ply plies from the root."""
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
 
 class TranspositionTable:
     """Stores previously evaluated positions to avoid recalculation.
 
-    Each entry stores (depth, eval, flag, best_move) where flag is
-    one of 'EXACT', 'LOWER', 'UPPER'. The lookup method accepts alpha/beta
-    so it can determine whether a stored bound is usable.
+    Entries (depth, eval, flag, best_move) are packed into a preallocated
+    array sized in megabytes, keyed by Zobrist hash and grouped into
+    BUCKET_SIZE-way buckets that evict the shallowest, oldest entry. Each
+    key word is XORed with its data word, so processes can share the table
+    without locks. Callers must check stored moves for legality.
     """
-    def __init__(self, size=100000):
-        self.table = {}
-        self.size = size
+    ENTRY_WORDS = 2
+    ENTRY_BYTES = 8 * ENTRY_WORDS
+    BUCKET_SIZE = 4
+    BUCKET_WORDS = ENTRY_WORDS * BUCKET_SIZE
+
+    GENERATION_MASK = 0x3F
+    AGE_WEIGHT = 4
+
+    # Snapshot header: magic, format, engine version, eval version, buckets,
+    # generation; padded to 64 bytes so the entries stay 8-byte aligned.
+    SNAPSHOT_MAGIC = b'CBTT'
+    SNAPSHOT_FORMAT = 1
+    SNAPSHOT_HEADER = struct.Struct('<4sIIIQQ')
+    SNAPSHOT_HEADER_BYTES = 64
+
+    FLAGS = ('EXACT', 'LOWER', 'UPPER')
+    FLAG_CODES = {'EXACT': 1, 'LOWER': 2, 'UPPER': 3}
+
+    SCORE_OFFSET = 1 << 31
+    SCORE_LIMIT = (1 << 31) - 1
+
+    def __init__(self, size_mb=16, buffer=None):
+        """Allocate a table of size_mb megabytes.
+
+        When buffer is given (e.g. a SharedMemory.buf), entries are read and
+        written in place through it instead of a private array; it must be
+        at least table_bytes(size_mb) long.
+        """
+        self.buckets = self._bucket_count(size_mb)
+        self.entries = self.buckets * self.BUCKET_SIZE
+        self.mask = self.buckets - 1
+        self.size_mb = size_mb
+        self.nbytes = self.entries * self.ENTRY_BYTES
+        self.generation = 0
+        self.mmap = None
+        if buffer is None:
+            self.table = array('Q', bytes(self.nbytes))
+        else:
+            self.table = memoryview(buffer)[:self.nbytes].cast('Q')
+
+    @classmethod
+    def _bucket_count(cls, size_mb):
+        buckets = max(1, int(size_mb * 1024 * 1024) // (cls.ENTRY_BYTES * cls.BUCKET_SIZE))
+        return _pow2_floor(buckets)
+
+    @classmethod
+    def table_bytes(cls, size_mb):
+        """Number of bytes a table of size_mb megabytes occupies."""
+        return cls._bucket_count(size_mb) * cls.BUCKET_SIZE * cls.ENTRY_BYTES
+
+    def release(self):
+        """Drop the view on an external buffer so its owner can close it."""
+        if isinstance(self.table, memoryview):
+            self.table.release()
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+
+    def save(self, path):
+        """Write a snapshot of the table to path (atomically replacing it)."""
+        header = self.SNAPSHOT_HEADER.pack(self.SNAPSHOT_MAGIC, self.SNAPSHOT_FORMAT, ENGINE_VERSION,
+                                           EVAL_VERSION, self.buckets, self.generation)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(header.ljust(self.SNAPSHOT_HEADER_BYTES, b'\0'))
+            f.write(self.table)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a snapshot written by save() and return it as a table.
+
+        The file is mapped copy-on-write, so nothing is read up front and
+        later stores stay private to this process. Raises ValueError when
+        the file is not a snapshot or was written by a different engine or
+        evaluation version.
+        """
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        try:
+            if len(mapped) < cls.SNAPSHOT_HEADER_BYTES:
+                raise ValueError(f"{path} is not a transposition table snapshot")
+            magic, fmt, engine_version, eval_version, buckets, generation = \
+                cls.SNAPSHOT_HEADER.unpack_from(mapped)
+            if magic != cls.SNAPSHOT_MAGIC or fmt != cls.SNAPSHOT_FORMAT:
+                raise ValueError(f"{path} is not a transposition table snapshot")
+            if engine_version != ENGINE_VERSION or eval_version != EVAL_VERSION:
+                raise ValueError(
+                    f"{path} was written by engine {engine_version}/eval {eval_version}, "
+                    f"expected engine {ENGINE_VERSION}/eval {EVAL_VERSION}")
+            size_mb = buckets * cls.BUCKET_SIZE * cls.ENTRY_BYTES / (1024 * 1024)
+            if len(mapped) != cls.SNAPSHOT_HEADER_BYTES + cls.table_bytes(size_mb):
+                raise ValueError(f"{path} is truncated")
+            table = cls(size_mb, buffer=memoryview(mapped)[cls.SNAPSHOT_HEADER_BYTES:])
+        except Exception:
+            mapped.close()
+            raise
+        table.generation = generation
+        table.mmap = mapped
+        return table
+
+    def new_search(self):
+        """Advance the generation so entries from earlier searches age out first."""
+        self.generation = (self.generation + 1) & self.GENERATION_MASK
+
+    def clear(self):
+        """Reset every entry to empty without reallocating."""
+        self.table[:] = array('Q', bytes(self.nbytes))
+
+    def _pack(self, depth, eval_score, flag, best_move):
+        score = int(max(-self.SCORE_LIMIT, min(self.SCORE_LIMIT, eval_score)))
+        return (encode_move(best_move)
+                | (self.FLAG_CODES[flag] << 16)
+                | (min(depth, 0xFF) << 18)
+                | (self.generation << 26)
+                | ((score + self.SCORE_OFFSET) << 32))
+
+    def _unpack(self, data):
+        """Return (depth, eval, flag, best_move) for a packed data word."""
+        return ((data >> 18) & 0xFF,
+                (data >> 32) - self.SCORE_OFFSET,
+                self.FLAGS[((data >> 16) & 0x3) - 1],
+                decode_move(data & 0xFFFF))
+
+    def store(self, key, depth, eval_score, flag='EXACT', best_move=None, ply=0):
+        """Store evaluation for a board position with a flag and optional best move.
+
+        Mate scores are stored relative to the node, which is ply plies from
+        the root, so they stay correct when read back at another ply.
+
+        Reuses the slot already holding key or an empty slot in the bucket;
+        otherwise evicts the shallowest, oldest entry. Quiescence results
+        (depth QSEARCH_DEPTH) are dropped rather than overwrite an entry
+        searched deeper.
+        """
+        table = self.table
+        base = (key & self.mask) * self.BUCKET_WORDS
+        victim = base
+        victim_score = None
+        for index in range(base, base + self.BUCKET_WORDS, self.ENTRY_WORDS):
+            data = table[index + 1]
+            if not data or table[index] ^ data == key:
+                victim = index
+                break
+            age = (self.generation - (data >> 26)) & self.GENERATION_MASK
+            score = ((data >> 18) & 0xFF) - self.AGE_WEIGHT * age
+            if victim_score is None or score < victim_score:
+                victim = index
+                victim_score = score
+        if depth == QSEARCH_DEPTH and (table[victim + 1] >> 18) & 0xFF > QSEARCH_DEPTH:
+            return
+        data = self._pack(depth, _score_to_tt(eval_score, ply), flag, best_move)
+        table[victim] = key ^ data
+        table[victim + 1] = data
 
-    def store(self, key, depth, eval_score, flag='EXACT', best_move=None):
-        """Store evaluation for a board position with a flag and optional best move."""
-        if len(self.table) > self.size:
-            self.table.clear()  # Simple cache eviction
-        self.table[key] = (depth, eval_score, flag, best_move)
+    def probe(self, key, ply=0):
+        """Return the entry (depth, eval, flag, best_move) for key, read at ply, or None."""
+        table = self.table
+        base = (key & self.mask) * self.BUCKET_WORDS
+        for index in range(base, base + self.BUCKET_WORDS, self.ENTRY_WORDS):
+            data = table[index + 1]
+            if data and table[index] ^ data == key:
+                depth, eval_score, flag, best_move = self._unpack(data)
+                return depth, _score_from_tt(eval_score, ply), flag, best_move
+        return None
 
-    def lookup(self, key, depth, alpha, beta):
+    def lookup(self, key, depth, alpha, beta, ply=0):
         """Retrieve a usable evaluation or None.
 
         Returns a tuple (best_move, eval, flag) when entry is usable for the
         provided alpha/beta/depth. Otherwise returns None.
         """
-        if key in self.table:
-            stored_depth, eval_score, flag, best_move = self.table[key]
+        entry = self.probe(key, ply)
+        if entry is not None:
+            stored_depth, eval_score, flag, best_move = entry
             if stored_depth >= depth:
                 if flag == 'EXACT':
                     return best_move, eval_score, flag
@@ -36,8 +360,424 @@ class TranspositionTable:
         return None
 
 
+class EvalCache:
+    """Fixed-size, always-replace cache of evaluation scores keyed by a 64-bit hash.
+
+    Sibling lines in quiescence reach the same positions over and over, so
+    a small direct-mapped table in front of evaluate() saves most of the
+    repeated work; the same class backs the pawn hash. hits/misses count
+    lookups since the last reset_stats().
+    """
+    def __init__(self, size=1 << 16):
+        self.size = _pow2_floor(size)
+        self.mask = self.size - 1
+        self.keys = array('Q', bytes(8 * self.size))
+        self.scores = array('q', bytes(8 * self.size))
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        """Return the cached score for key, or None."""
+        index = key & self.mask
+        if self.keys[index] == key:
+            self.hits += 1
+            return self.scores[index]
+        self.misses += 1
+        return None
+
+    def store(self, key, score):
+        index = key & self.mask
+        self.keys[index] = key
+        self.scores[index] = score
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+
+def _piece_code(piece_type, color):
+    """Mailbox encoding of a piece: type in the low three bits, 8 for white."""
+    return piece_type | (8 if color else 0)
+
+
+# Polyglot Zobrist keys, laid out for incremental hashing in SearchBoard
+_POLYGLOT = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+PIECE_KEYS = [[0] * 64 for _ in range(16)]
+for _color in chess.COLORS:
+    for _piece_type in chess.PIECE_TYPES:
+        PIECE_KEYS[_piece_code(_piece_type, _color)] = [
+            _POLYGLOT[64 * ((_piece_type - 1) * 2 + int(_color)) + sq] for sq in chess.SQUARES
+        ]
+CASTLING_KEYS = ((chess.BB_H1, _POLYGLOT[768]), (chess.BB_A1, _POLYGLOT[769]),
+                 (chess.BB_H8, _POLYGLOT[770]), (chess.BB_A8, _POLYGLOT[771]))
+EP_FILE_KEYS = _POLYGLOT[772:780]
+TURN_KEY = _POLYGLOT[780]
+
+
+def pawn_king_key(board):
+    """Zobrist key of just the pawns and kings, which key the pawn hash."""
+    key = 0
+    for square in chess.scan_forward(board.pawns | board.kings):
+        key ^= PIECE_KEYS[_piece_code(board.piece_type_at(square), board.color_at(square))][square]
+    return key
+
+
+def _castling_key(castling_rights):
+    key = 0
+    for mask, castling_key in CASTLING_KEYS:
+        if castling_rights & mask:
+            key ^= castling_key
+    return key
+
+
+# Cuckoo table of reversible moves for upcoming-repetition detection: for
+# every non-pawn piece and pair of squares it can travel between on an
+# empty board, the hash difference the move makes (piece keys plus the side
+# to move), stored with two hash functions. See has_upcoming_repetition().
+CUCKOO_SIZE = 8192
+CUCKOO_KEYS = [0] * CUCKOO_SIZE
+CUCKOO_MOVES = [None] * CUCKOO_SIZE
+
+
+def _cuckoo_h1(key):
+    return key & (CUCKOO_SIZE - 1)
+
+
+def _cuckoo_h2(key):
+    return (key >> 16) & (CUCKOO_SIZE - 1)
+
+
+def _empty_board_attacks(piece_type, square):
+    if piece_type == chess.KNIGHT:
+        return chess.BB_KNIGHT_ATTACKS[square]
+    if piece_type == chess.KING:
+        return chess.BB_KING_ATTACKS[square]
+    attacks = 0
+    if piece_type in (chess.BISHOP, chess.QUEEN):
+        attacks |= chess.BB_DIAG_ATTACKS[square][0]
+    if piece_type in (chess.ROOK, chess.QUEEN):
+        attacks |= chess.BB_FILE_ATTACKS[square][0] | chess.BB_RANK_ATTACKS[square][0]
+    return attacks
+
+
+def _build_cuckoo_table():
+    for color in chess.COLORS:
+        for piece_type in (chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN, chess.KING):
+            keys = PIECE_KEYS[_piece_code(piece_type, color)]
+            for from_square in chess.SQUARES:
+                for to_square in range(from_square + 1, 64):
+                    if not _empty_board_attacks(piece_type, from_square) & chess.BB_SQUARES[to_square]:
+                        continue
+                    key = keys[from_square] ^ keys[to_square] ^ TURN_KEY
+                    move = (from_square, to_square)
+                    index = _cuckoo_h1(key)
+                    # Insert, evicting to the occupant's other slot until one is free
+                    while True:
+                        CUCKOO_KEYS[index], key = key, CUCKOO_KEYS[index]
+                        CUCKOO_MOVES[index], move = move, CUCKOO_MOVES[index]
+                        if move is None:
+                            break
+                        index = _cuckoo_h2(key) if index == _cuckoo_h1(key) else _cuckoo_h1(key)
+
+
+_build_cuckoo_table()
+
+
+class SearchBoard(chess.Board):
+    """chess.Board with cheap make()/unmake() for the search hot loop.
+
+    push()/pop() snapshot the whole board state and keep a move stack for
+    every move. make() instead records only what it changes and updates
+    the bitboards in place, alongside a 64-square mailbox (piece codes from
+    _piece_code(), 0 for empty) and the Polyglot Zobrist hash, so
+    piece lookups (mailbox[square]) and zobrist are O(1) at every node. The bitboards double
+    as the piece lists.
+
+    hash_history holds the hashes of the positions before the current one,
+    back to the last irreversible move (seeded from the game's move stack),
+    for repetition detection.
+
+    Build one with from_board() at the start of a search; only the search
+    should call make()/unmake(). Standard chess only. push()/pop() still
+    work for paired push-test-pop probes such as gives_check(), but the
+    mailbox is not updated in between.
+    """
+
+    @classmethod
+    def from_board(cls, board):
+        search_board = cls(board.fen())
+        search_board.castling_rights = search_board.clean_castling_rights()
+        search_board.mailbox = [0] * 64
+        for square, piece in search_board.piece_map().items():
+            search_board.mailbox[square] = _piece_code(piece.piece_type, piece.color)
+        search_board.zobrist = chess.polyglot.zobrist_hash(search_board)
+        search_board.pawn_key = pawn_king_key(search_board)
+        search_board.ep_key = chess.polyglot.ZobristHasher(_POLYGLOT).hash_ep_square(search_board)
+        search_board.undo_stack = []
+        # Hashes of the game positions since the last irreversible move
+        search_board.hash_history = []
+        replay = board.copy()
+        for _ in range(min(board.halfmove_clock, len(board.move_stack))):
+            replay.pop()
+            search_board.hash_history.append(chess.polyglot.zobrist_hash(replay))
+        search_board.hash_history.reverse()
+        return search_board
+
+    def is_repetition_draw(self):
+        """True if the current position already occurred since the last irreversible move."""
+        history = self.hash_history
+        key = self.zobrist
+        # Same side to move means an even distance, and a position can
+        # repeat at the earliest four plies later
+        oldest = max(len(history) - self.halfmove_clock, 0)
+        for index in range(len(history) - 4, oldest - 1, -2):
+            if history[index] == key:
+                return True
+        return False
+
+    def has_upcoming_repetition(self):
+        """True if the side to move can repeat a position inside the search with one move.
+
+        The current hash XOR a same-side earlier hash (an odd number of
+        plies back) equals the hash change of a single reversible move
+        exactly when one piece move would recreate that position. Such
+        moves are looked up in the cuckoo table, and the move counts when
+        one of its squares holds a piece of the side to move and nothing
+        stands between them. Only positions reached within the current
+        search are considered. Pins and checks are not tested, so a hit
+        means a repeating move is very likely available, not that it is
+        legal.
+        """
+        history = self.hash_history
+        length = len(history)
+        end = min(self.halfmove_clock, len(self.undo_stack) - 1)
+        if end < 3:
+            return False
+        key = self.zobrist
+        occupied = self.occupied
+        own = self.occupied_co[self.turn]
+        for distance in range(3, end + 1, 2):
+            move_key = key ^ history[length - distance]
+            index = _cuckoo_h1(move_key)
+            if CUCKOO_KEYS[index] != move_key:
+                index = _cuckoo_h2(move_key)
+                if CUCKOO_KEYS[index] != move_key:
+                    continue
+            from_square, to_square = CUCKOO_MOVES[index]
+            if (own & (chess.BB_SQUARES[from_square] | chess.BB_SQUARES[to_square])
+                    and not chess.between(from_square, to_square) & occupied):
+                return True
+        return False
+
+    def _toggle(self, square, code):
+        """XOR a piece in or out of the bitboards and the hashes."""
+        mask = chess.BB_SQUARES[square]
+        piece_type = code & 7
+        if piece_type == chess.PAWN:
+            self.pawns ^= mask
+            self.pawn_key ^= PIECE_KEYS[code][square]
+        elif piece_type == chess.KNIGHT:
+            self.knights ^= mask
+        elif piece_type == chess.BISHOP:
+            self.bishops ^= mask
+        elif piece_type == chess.ROOK:
+            self.rooks ^= mask
+        elif piece_type == chess.QUEEN:
+            self.queens ^= mask
+        else:
+            self.kings ^= mask
+            self.pawn_key ^= PIECE_KEYS[code][square]
+        self.occupied ^= mask
+        self.occupied_co[code >> 3] ^= mask
+        self.zobrist ^= PIECE_KEYS[code][square]
+
+    def make(self, move):
+        """Play a pseudo-legal move; returns the captured piece type (0 if none)."""
+        mailbox = self.mailbox
+        from_square = move.from_square
+        to_square = move.to_square
+        turn = self.turn
+        code = mailbox[from_square]
+        piece_type = code & 7
+        captured = mailbox[to_square]
+        capture_square = to_square
+        castling_rights = self.castling_rights
+        zobrist = self.zobrist
+
+        if not captured and piece_type == chess.PAWN and to_square == self.ep_square:
+            capture_square = to_square - 8 if turn == chess.WHITE else to_square + 8
+            captured = mailbox[capture_square]
+        new_code = (move.promotion | (code & 8)) if move.promotion else code
+
+        changes = [(from_square, code), (to_square, mailbox[to_square])]
+        self._toggle(from_square, code)
+        mailbox[from_square] = 0
+        if captured:
+            self._toggle(capture_square, captured)
+            if capture_square != to_square:
+                changes.append((capture_square, captured))
+                mailbox[capture_square] = 0
+        self._toggle(to_square, new_code)
+        mailbox[to_square] = new_code
+
+        if piece_type == chess.KING and abs(to_square - from_square) == 2:
+            if to_square > from_square:
+                rook_from, rook_to = from_square + 3, from_square + 1
+            else:
+                rook_from, rook_to = from_square - 4, from_square - 1
+            rook = mailbox[rook_from]
+            changes.append((rook_from, rook))
+            changes.append((rook_to, 0))
+            self._toggle(rook_from, rook)
+            self._toggle(rook_to, rook)
+            mailbox[rook_from] = 0
+            mailbox[rook_to] = rook
+
+        self.undo_stack.append((changes, castling_rights, self.ep_square, self.ep_key,
+                                self.halfmove_clock, self.promoted, zobrist))
+        self.hash_history.append(zobrist)
+
+        # Castling rights, as in Board.push()
+        from_bb = chess.BB_SQUARES[from_square]
+        to_bb = chess.BB_SQUARES[to_square]
+        castling_rights &= ~to_bb & ~from_bb
+        if piece_type == chess.KING:
+            castling_rights &= ~(chess.BB_RANK_1 if turn == chess.WHITE else chess.BB_RANK_8)
+        if castling_rights != self.castling_rights:
+            self.zobrist ^= _castling_key(self.castling_rights) ^ _castling_key(castling_rights)
+            self.castling_rights = castling_rights
+
+        if self.promoted:
+            was_promoted = self.promoted & from_bb
+            self.promoted &= ~(from_bb | to_bb)
+            if was_promoted:
+                self.promoted |= to_bb
+        if move.promotion:
+            self.promoted |= to_bb
+
+        # En passant square; the hash only includes it when a capture is possible
+        self.zobrist ^= self.ep_key
+        self.ep_square = None
+        self.ep_key = 0
+        if piece_type == chess.PAWN and abs(to_square - from_square) == 16:
+            self.ep_square = (from_square + to_square) >> 1
+            to_mask = to_bb
+            adjacent = chess.shift_left(to_mask) | chess.shift_right(to_mask)
+            if adjacent & self.pawns & self.occupied_co[not turn]:
+                self.ep_key = EP_FILE_KEYS[to_square & 7]
+                self.zobrist ^= self.ep_key
+
+        if piece_type == chess.PAWN or captured:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if turn == chess.BLACK:
+            self.fullmove_number += 1
+        self.turn = not turn
+        self.zobrist ^= TURN_KEY
+        return captured & 7
+
+    def make_null(self):
+        """Pass the turn without moving (a null move); take it back with unmake().
+
+        The halfmove clock restarts so repetition checks never look across
+        the null move, which cannot happen in a real game.
+        """
+        zobrist = self.zobrist
+        self.undo_stack.append(([], self.castling_rights, self.ep_square, self.ep_key,
+                                self.halfmove_clock, self.promoted, zobrist))
+        self.hash_history.append(zobrist)
+        self.zobrist ^= self.ep_key ^ TURN_KEY
+        self.ep_square = None
+        self.ep_key = 0
+        self.halfmove_clock = 0
+        if self.turn == chess.BLACK:
+            self.fullmove_number += 1
+        self.turn = not self.turn
+
+    def unmake(self):
+        """Take back the last make() or make_null()."""
+        changes, castling_rights, ep_square, ep_key, halfmove_clock, promoted, zobrist = self.undo_stack.pop()
+        self.hash_history.pop()
+        mailbox = self.mailbox
+        # Toggling is its own inverse, so XOR every changed square back
+        for square, code in changes:
+            current = mailbox[square]
+            if current:
+                self._toggle(square, current)
+            if code:
+                self._toggle(square, code)
+            mailbox[square] = code
+        self.turn = not self.turn
+        if self.turn == chess.BLACK:
+            self.fullmove_number -= 1
+        self.castling_rights = castling_rights
+        self.ep_square = ep_square
+        self.ep_key = ep_key
+        self.halfmove_clock = halfmove_clock
+        self.promoted = promoted
+        self.zobrist = zobrist
+
+
+class KingSafety:
+    """Check and pin state of the side to move, for testing pseudo-legal moves one at a time.
+
+    The only user of python-chess's private Board._slider_blockers(),
+    _generate_evasions() and _is_safe() helpers.
+    """
+    __slots__ = ('board', 'king', 'checkers', 'blockers')
+
+    def __init__(self, board):
+        self.board = board
+        self.king = board.king(board.turn)
+        self.checkers = board.checkers_mask()
+        self.blockers = board._slider_blockers(self.king) if self.king is not None else 0
+
+    def evasions(self):
+        """Pseudo-legal check evasions as (captures and promotions, other moves)."""
+        board = self.board
+        noisy = []
+        quiet = []
+        for move in board._generate_evasions(self.king, self.checkers):
+            (noisy if move.promotion or board.is_capture(move) else quiet).append(move)
+        return noisy, quiet
+
+    def is_safe(self, move):
+        """True if pseudo-legal move does not leave the side to move in check."""
+        return self.king is None or self.board._is_safe(self.king, self.blockers, move)
+
+
+class SearchPly:
+    """Per-ply search state: killer moves, static eval and the PV.
+
+    ChessBot keeps one per ply in search_stack, allocated up front and
+    reused by every node at that ply; the stack grows when a search gets
+    deeper than it has been before.
+    """
+    __slots__ = ('killer1', 'killer2', 'static_eval', 'pv')
+
+    def __init__(self):
+        self.killer1 = None
+        self.killer2 = None
+        # None when in check; search() compares it with the same side's
+        # static eval two plies up to tell whether the position is improving
+        self.static_eval = None
+        # Principal variation from this ply, rebuilt whenever a move raises alpha
+        self.pv = []
+
+    def add_killer(self, move):
+        """Make move the first killer, keeping the previous first killer as the second."""
+        if move != self.killer1:
+            self.killer2 = self.killer1
+            self.killer1 = move
+
+
+# Plies preallocated in ChessBot.search_stack; deeper searches extend it
+SEARCH_STACK_SIZE = 64
+
+
 class ChessBot:
-    def __init__(self, width=800, height=800, offset=(0,0)):
+    def __init__(self, width=800, height=800, offset=(0,0), hash_size_mb=16, transposition_table=None):
         self.board = chess.Board()
         self.width = width
         self.height = height
@@ -49,8 +789,36 @@ class ChessBot:
         self.game_moves = ""
         self.move_number = 0
         self.history_table = [[0] * 8 for _ in range(8)]
-        self.killer_moves = [None] * 5
-        self.transposition_table = TranspositionTable(size=100000)
+        # Killers, static evals and PVs by ply from the root (see _search_ply())
+        self.search_stack = [SearchPly() for _ in range(SEARCH_STACK_SIZE)]
+        if transposition_table is None:
+            transposition_table = TranspositionTable(size_mb=hash_size_mb)
+        self.transposition_table = transposition_table
+        self.eval_cache = EvalCache()
+        # Pawn-structure scores keyed by pawn and king placement
+        self.pawn_hash = EvalCache(size=1 << 14)
+        # Incrementally updated white-minus-black material (see prepare_search())
+        self.material = 0
+        self.material_stack = []
+        # Debug mode: verify every incremental evaluation against evaluate()
+        self.check_incremental_eval = False
+        # Forward pruning switches, for A/B comparisons
+        self.use_probcut = True
+        self.use_multicut = True
+        # Node and pruning counters of the last search (see _reset_search_stats())
+        self._reset_search_stats()
+        # One dict per iteration of the last search: depth, score, principal
+        # variation, the aspiration window it started with and its
+        # fail-lows/fail-highs
+        self.iteration_stats = []
+        # Shared-memory segment backing the TT once a parallel search has run
+        self.shared_memory = None
+        # Set by Lazy SMP to a shared flag the main process raises to stop helpers
+        self.stop_flag = None
+        # Worker pool and shared alpha for root-splitting parallel search
+        self.root_split_pool = None
+        self.root_split_threads = None
+        self.root_split_alpha = None
         # MVV-LVA table for capture ordering (victim piece -> attacker piece score)
         self.mvv_lva = {
             chess.PAWN: 1,
@@ -62,6 +830,30 @@ class ChessBot:
         }
 
 
+    def _reset_search_stats(self):
+        """Zero the counters describing the last search."""
+        # Nodes (search + quiescence) visited, and how many were quiescence nodes
+        self.nodes = 0
+        self.qnodes = 0
+        # Null-window searches that failed high and were re-searched (PVS)
+        self.pvs_researches = 0
+        # Nodes cut off by null-move pruning
+        self.null_move_cutoffs = 0
+        # Moves searched with a late move reduction, and those re-searched
+        # at full depth after beating alpha
+        self.lmr_reductions = 0
+        self.lmr_researches = 0
+        # Nodes returned by reverse futility pruning or razoring, and quiet
+        # moves skipped by futility pruning
+        self.reverse_futility_prunes = 0
+        self.razor_prunes = 0
+        self.futility_prunes = 0
+        # Quiet moves skipped by late move pruning
+        self.late_move_prunes = 0
+        # Nodes cut by ProbCut and by multi-cut
+        self.probcut_prunes = 0
+        self.multicut_prunes = 0
+
     def switch_player(self):
         """Switch the turn between white and black"""
         self.turn = 'white' if self.turn == 'black' else 'black'
@@ -72,61 +864,70 @@ class ChessBot:
 
     def evaluate(self):
         """Evaluation based on material balance, pawn structure, and king safety"""
-        pawn_value = self.mvv_lva[chess.PAWN]
-        knight_value = self.mvv_lva[chess.KNIGHT]
-        bishop_value = self.mvv_lva[chess.BISHOP]
-        rook_value = self.mvv_lva[chess.ROOK]
-        queen_value = self.mvv_lva[chess.QUEEN]
+        return self._material_score() + self._pawn_structure_score()
+
+    def _material_score(self):
+        """White-minus-black material using the mvv_lva piece values."""
+        board = self.board
+        white = board.occupied_co[chess.WHITE]
+        black = board.occupied_co[chess.BLACK]
+
+        eval_score = 0
+        for piece_type, pieces in ((chess.PAWN, board.pawns), (chess.KNIGHT, board.knights),
+                                   (chess.BISHOP, board.bishops), (chess.ROOK, board.rooks),
+                                   (chess.QUEEN, board.queens)):
+            eval_score += self.mvv_lva[piece_type] * (chess.popcount(pieces & white) - chess.popcount(pieces & black))
 
+        return eval_score
+
+    def _pawn_structure_score(self):
+        """Pawn-structure and king-shield terms, cached in the pawn hash.
+
+        These terms depend only on where the pawns and kings stand, which
+        changes far less often than the rest of the position, so the score
+        is keyed by a Zobrist key of the pawns and kings alone, which the
+        SearchBoard keeps up to date incrementally.
+        """
+        board = self.board
+        pawn_key = board.pawn_key if isinstance(board, SearchBoard) else pawn_king_key(board)
+        score = self.pawn_hash.lookup(pawn_key)
+        if score is None:
+            score = self._evaluate_pawn_structure()
+            self.pawn_hash.store(pawn_key, score)
+        return score
+
+    def _evaluate_pawn_structure(self):
+        """Passed and isolated pawn terms plus both kings' pawn shields (white minus black)."""
         passed_pawn_bonuses = [0, 120, 80, 50, 30, 15, 15, 120]
         isolated_pawn_penalty = [0, -10, -25, -50, -75, -75, -75, -75, -75]
-        king_pawn_shield_scores = [4, 7, 4, 3, 6, 3]
 
         eval_score = 0
         white_isolated_pawns = 0
         black_isolated_pawns = 0
 
-        for square, piece in self.board.piece_map().items():
-            value = 0
-            file_index = square % 8
-            rank_index = square // 8
+        board = self.board
+        white_pawns = board.pawns & board.occupied_co[chess.WHITE]
+        black_pawns = board.pawns & board.occupied_co[chess.BLACK]
 
-            if piece.piece_type == 1:  # pawn
-                value = pawn_value
-                
-                # Check if pawn is passed
-                if piece.color:  # white pawn
-                    if self._is_passed_pawn(square, piece.color):
-                        value += passed_pawn_bonuses[rank_index]
-                    if self._is_isolated_pawn(square, piece.color):
-                        white_isolated_pawns += 1
-                else:  # black pawn
-                    if self._is_passed_pawn(square, piece.color):
-                        value += passed_pawn_bonuses[7 - rank_index]
-                    if self._is_isolated_pawn(square, piece.color):
-                        black_isolated_pawns += 1
-                        
-            elif piece.piece_type == 2:  # knight
-                value = knight_value
-            elif piece.piece_type == 3:  # bishop
-                value = bishop_value
-            elif piece.piece_type == 4:  # rook
-                value = rook_value
-            elif piece.piece_type == 5:  # queen
-                value = queen_value
-            elif piece.piece_type == 6:  # king
-                # Bonus for king pawn shield
-                if piece.color:  # white king
-                    shield_bonus = self._calculate_king_shield(square, True)
-                    value += shield_bonus
-                else:  # black king
-                    shield_bonus = self._calculate_king_shield(square, False)
-                    value += shield_bonus
-
-            if piece.color:  # white
-                eval_score += value
-            else:  # black
-                eval_score -= value
+        for square in chess.scan_forward(white_pawns):
+            if not PASSED_PAWN_MASKS[chess.WHITE][square] & black_pawns:
+                eval_score += passed_pawn_bonuses[square >> 3]
+            if not ADJACENT_FILE_MASKS[square & 7] & white_pawns:
+                white_isolated_pawns += 1
+
+        for square in chess.scan_forward(black_pawns):
+            if not PASSED_PAWN_MASKS[chess.BLACK][square] & white_pawns:
+                eval_score -= passed_pawn_bonuses[7 - (square >> 3)]
+            if not ADJACENT_FILE_MASKS[square & 7] & black_pawns:
+                black_isolated_pawns += 1
+
+        # Bonus for king pawn shield
+        for square in chess.scan_forward(board.kings & board.occupied_co[chess.WHITE]):
+            for mask, score in KING_SHIELD_MASKS[chess.WHITE][square]:
+                eval_score += score * chess.popcount(mask & white_pawns)
+        for square in chess.scan_forward(board.kings & board.occupied_co[chess.BLACK]):
+            for mask, score in KING_SHIELD_MASKS[chess.BLACK][square]:
+                eval_score -= score * chess.popcount(mask & black_pawns)
 
         # Apply isolated pawn penalties
         eval_score += isolated_pawn_penalty[white_isolated_pawns]
@@ -134,27 +935,159 @@ class ChessBot:
 
         return eval_score
 
+    def cached_evaluate(self, key=None):
+        """Search-side evaluation through the eval cache; key defaults to the current position's hash."""
+        if key is None:
+            key = self.generate_transposition_key()
+        score = self.eval_cache.lookup(key)
+        if score is None:
+            score = self.incremental_evaluate()
+            self.eval_cache.store(key, score)
+        return score
+
+    def _static_eval(self, key=None):
+        """cached_evaluate() from the side to move's point of view, as negamax scores are."""
+        score = self.cached_evaluate(key)
+        return score if self.board.turn == chess.WHITE else -score
+
+    def prepare_search(self):
+        """Switch self.board to a SearchBoard copy and initialise the incremental state.
+
+        Every search entry point calls this before making moves with
+        _make_move(), and puts the returned original board back into
+        self.board when it is done, so callers only ever see chess.Board.
+        """
+        root_board = self.board
+        self.board = SearchBoard.from_board(root_board)
+        self.material = self._material_score()
+        self.material_stack = []
+        # Killers are indexed by ply, so those of a search from another
+        # root describe unrelated positions
+        for frame in self.search_stack:
+            frame.killer1 = frame.killer2 = None
+        return root_board
+
+    def _search_ply(self, ply):
+        """The search stack entry for ply, growing the stack so ply + 1 exists too."""
+        stack = self.search_stack
+        while len(stack) <= ply + 1:
+            stack.append(SearchPly())
+        return stack[ply]
+
+    def incremental_evaluate(self):
+        """Same score as evaluate(), using the material kept up to date by _make_move().
+
+        Only the pawn-structure terms are looked up (or recomputed on a
+        pawn-hash miss). With check_incremental_eval set, every call is
+        compared against a full evaluate() and drift raises AssertionError.
+        """
+        score = self.material + self._pawn_structure_score()
+        if self.check_incremental_eval:
+            expected = self.evaluate()
+            if score != expected:
+                raise AssertionError(
+                    f"incremental eval {score} != evaluate() {expected} in {self.board.fen()}")
+        return score
+
+    def _make_move(self, move):
+        """Make move on the search board and update the incremental evaluation."""
+        board = self.board
+        self.material_stack.append(self.material)
+        turn = board.turn
+        captured = board.make(move)
+        delta = self.mvv_lva[captured] if captured else 0
+        if move.promotion:
+            delta += self.mvv_lva[move.promotion] - self.mvv_lva[chess.PAWN]
+        self.material += delta if turn == chess.WHITE else -delta
+
+    def _make_null_move(self):
+        """Pass the turn on the search board; material is unchanged. Undo with _unmake_move()."""
+        self.material_stack.append(self.material)
+        self.board.make_null()
+
+    def _unmake_move(self):
+        """Undo the last _make_move() or _make_null_move()."""
+        self.board.unmake()
+        self.material = self.material_stack.pop()
+
     def _score_move_mvv_lva(self, move):
         """Score a capture using MVV-LVA; promotions are high priority."""
         score = 0
-        if self.board.is_capture(move):
-            victim = self.board.piece_at(move.to_square)
-            attacker = self.board.piece_at(move.from_square)
-            if victim and attacker:
-                score += 1000 * self.mvv_lva.get(victim.piece_type, 0) - self.mvv_lva.get(attacker.piece_type, 0)
-            else:
-                score += 1000
+        mailbox = self.board.mailbox
+        victim = mailbox[move.to_square] & 7
+        if victim:
+            score += 1000 * self.mvv_lva[victim] - self.mvv_lva[mailbox[move.from_square] & 7]
+        elif self.board.is_en_passant(move):
+            score += 1000
         if move.promotion:
             score += 800
         # history heuristic
         score += self.history_table[move.from_square // 8][move.from_square % 8]
         return score
 
-    def order_moves(self, moves, depth):
+    def see(self, move):
+        """Static exchange evaluation: material won by move after all recaptures on its square.
+
+        Both sides recapture with their least valuable attacker and may stop
+        whenever continuing would lose material. Attackers are recomputed
+        from board.attackers_mask() with the pieces already used removed from
+        the occupancy, so sliders lined up behind them (x-rays) join in.
+        Pins are ignored. Returns mvv_lva units; negative means losing.
+        """
+        board = self.board
+        values = self.mvv_lva
+        to_square = move.to_square
+        occupied = board.occupied ^ chess.BB_SQUARES[move.from_square]
+        if board.is_en_passant(move):
+            gain = values[chess.PAWN]
+            occupied ^= chess.BB_SQUARES[to_square ^ 8]
+        else:
+            victim = board.mailbox[to_square] & 7
+            gain = values[victim] if victim else 0
+        attacker = board.mailbox[move.from_square] & 7
+        if move.promotion:
+            gain += values[move.promotion] - values[chess.PAWN]
+            attacker = move.promotion
+
+        gains = [gain]
+        pieces = ((chess.PAWN, board.pawns), (chess.KNIGHT, board.knights), (chess.BISHOP, board.bishops),
+                  (chess.ROOK, board.rooks), (chess.QUEEN, board.queens), (chess.KING, board.kings))
+        color = not board.turn
+        while True:
+            attackers = board.attackers_mask(color, to_square, occupied) & occupied & board.occupied_co[color]
+            if not attackers:
+                break
+            for piece_type, bb in pieces:
+                if attackers & bb:
+                    break
+            if piece_type == chess.KING and board.attackers_mask(not color, to_square, occupied) & occupied:
+                # The king cannot recapture onto a defended square
+                break
+            gains.append(values[attacker] - gains[-1])
+            attacker = piece_type
+            occupied ^= chess.BB_SQUARES[chess.lsb(attackers & bb)]
+            color = not color
+
+        # Each side picks the better of standing pat and continuing the exchange
+        while len(gains) > 1:
+            last = gains.pop()
+            gains[-1] = -max(-gains[-1], last)
+        return gains[0]
+
+    def _is_losing_capture(self, move):
+        """True if SEE says move loses material. Captures of a piece at least as valuable never do."""
+        mailbox = self.board.mailbox
+        victim = mailbox[move.to_square] & 7
+        if victim and not move.promotion and self.mvv_lva[victim] >= self.mvv_lva[mailbox[move.from_square] & 7]:
+            return False
+        return self.see(move) < 0
+
+    def order_moves(self, moves, ply=0):
         """Order moves to improve alpha-beta pruning: TT move, captures (MVV-LVA), killer moves, history."""
         scored = []
+        frame = self._search_ply(ply)
         tt_key = self.generate_transposition_key()
-        tt_entry = self.transposition_table.table.get(tt_key)
+        tt_entry = self.transposition_table.probe(tt_key)
         tt_best = tt_entry[3] if tt_entry else None
 
         for move in moves:
@@ -162,177 +1095,666 @@ class ChessBot:
             if tt_best is not None and move == tt_best:
                 score += 1000000
             score += self._score_move_mvv_lva(move)
+            # Captures that lose material by SEE go after every other move
+            if (move.promotion or self.board.is_capture(move)) and self._is_losing_capture(move):
+                score -= 1000000
             # killer moves bonus
-            if depth < len(self.killer_moves) and self.killer_moves[depth] == move:
+            if move == frame.killer1 or move == frame.killer2:
                 score += 500
             scored.append((score, move))
 
         scored.sort(key=lambda x: x[0], reverse=True)
         return [m for _, m in scored]
 
+    def _generate_captures(self):
+        """Pseudo-legal captures and promotions (side to move not in check)."""
+        board = self.board
+        own_pawns = board.pawns & board.occupied_co[board.turn]
+        captures = list(board.generate_pseudo_legal_captures())
+        captures.extend(board.generate_pseudo_legal_moves(own_pawns, chess.BB_BACKRANKS & ~board.occupied))
+        return captures
+
+    def _capture_gain(self, move):
+        """Material move wins outright: the captured piece plus any promotion gain."""
+        board = self.board
+        victim = board.mailbox[move.to_square] & 7
+        if victim:
+            gain = self.mvv_lva[victim]
+        elif board.is_en_passant(move):
+            gain = self.mvv_lva[chess.PAWN]
+        else:
+            gain = 0
+        if move.promotion:
+            gain += self.mvv_lva[move.promotion] - self.mvv_lva[chess.PAWN]
+        return gain
+
+    def staged_moves(self, ply, tt_move=None):
+        """Yield legal moves stage by stage, generating each stage only when needed.
+
+        Stages: the TT move (checked for legality, nothing generated), then
+        captures and promotions that do not lose material by SEE in MVV-LVA
+        order, then the ply's two killer moves, then the remaining quiet moves in
+        history order, and finally the losing captures. At cut nodes the search
+        usually stops after the first stage or two, so most moves are never
+        generated or scored.
+
+        Stages are generated pseudo-legally (check evasions when in check)
+        and each move's legality is only tested with KingSafety.is_safe()
+        when it is about to be yielded, so
+        moves after a cutoff are never tested. Yields nothing when the side
+        to move has no legal moves.
+        """
+        board = self.board
+        safety = KingSafety(board)
+        checkers = safety.checkers
+
+        if tt_move is not None and board.is_legal(tt_move):
+            yield tt_move
+        else:
+            tt_move = None
+
+        if checkers:
+            captures, quiet_evasions = safety.evasions()
+        else:
+            captures = self._generate_captures()
+        captures.sort(key=self._score_move_mvv_lva, reverse=True)
+        bad_captures = []
+        for move in captures:
+            if move == tt_move:
+                continue
+            if self._is_losing_capture(move):
+                bad_captures.append(move)
+            elif safety.is_safe(move):
+                yield move
+
+        frame = self._search_ply(ply)
+        killer1 = frame.killer1
+        if killer1 is not None and killer1 != tt_move and not board.is_capture(killer1) and board.is_legal(killer1):
+            yield killer1
+        else:
+            killer1 = None
+        killer2 = frame.killer2
+        if killer2 is not None and killer2 != tt_move and not board.is_capture(killer2) and board.is_legal(killer2):
+            yield killer2
+        else:
+            killer2 = None
+
+        # Castling targets the king's own rook internally, so only exclude
+        # enemy pieces; en passant lands on an empty square and is skipped here
+        history = self.history_table
+        if checkers:
+            quiets = [move for move in quiet_evasions if move != tt_move and move != killer1 and move != killer2]
+        else:
+            ep_square = board.ep_square
+            quiets = [move for move in board.generate_pseudo_legal_moves(chess.BB_ALL, ~board.occupied_co[not board.turn])
+                      if not move.promotion and move != tt_move and move != killer1 and move != killer2
+                      and not (move.to_square == ep_square and board.is_en_passant(move))]
+        quiets.sort(key=lambda move: history[move.from_square // 8][move.from_square % 8], reverse=True)
+        for move in quiets:
+            if safety.is_safe(move):
+                yield move
+
+        for move in bad_captures:
+            if safety.is_safe(move):
+                yield move
+
     def _is_passed_pawn(self, square, is_white):
         """Check if a pawn is passed (no opposing pawns ahead)"""
-        file_index = square % 8
-        rank_index = square // 8
-
-        if is_white:
-            # Check ranks above the pawn on adjacent files
-            for rank in range(rank_index + 1, 8):
-                for file in [file_index - 1, file_index, file_index + 1]:
-                    if 0 <= file < 8:
-                        check_square = rank * 8 + file
-                        piece = self.board.piece_at(check_square)
-                        if piece and piece.piece_type == 1 and not piece.color:  # black pawn
-                            return False
-        else:
-            # Check ranks below the pawn on adjacent files
-            for rank in range(rank_index - 1, -1, -1):
-                for file in [file_index - 1, file_index, file_index + 1]:
-                    if 0 <= file < 8:
-                        check_square = rank * 8 + file
-                        piece = self.board.piece_at(check_square)
-                        if piece and piece.piece_type == 1 and piece.color:  # white pawn
-                            return False
-        return True
+        enemy_pawns = self.board.pawns & self.board.occupied_co[not is_white]
+        return not PASSED_PAWN_MASKS[is_white][square] & enemy_pawns
 
     def _is_isolated_pawn(self, square, is_white):
         """Check if a pawn is isolated (no pawns on adjacent files)"""
-        file_index = square % 8
-
-        for file in [file_index - 1, file_index + 1]:
-            if 0 <= file < 8:
-                for rank in range(8):
-                    check_square = rank * 8 + file
-                    piece = self.board.piece_at(check_square)
-                    if piece and piece.piece_type == 1 and piece.color == is_white:
-                        return False
-        return True
+        own_pawns = self.board.pawns & self.board.occupied_co[is_white]
+        return not ADJACENT_FILE_MASKS[square & 7] & own_pawns
 
     def _calculate_king_shield(self, square, is_white):
         """Calculate king pawn shield bonus"""
-        king_pawn_shield_scores = [4, 7, 4, 3, 6, 3]
-        file_index = square % 8
-        rank_index = square // 8
+        own_pawns = self.board.pawns & self.board.occupied_co[is_white]
         shield_bonus = 0
-
-        if is_white:
-            # Check pawns in front of white king (rank 1 area)
-            for file in range(max(0, file_index - 1), min(8, file_index + 2)):
-                for rank in range(rank_index, min(8, rank_index + 2)):
-                    check_square = rank * 8 + file
-                    piece = self.board.piece_at(check_square)
-                    if piece and piece.piece_type == 1 and piece.color:  # white pawn
-                        shield_bonus += king_pawn_shield_scores[min(5, file)]
-        else:
-            # Check pawns in front of black king (rank 6 area)
-            for file in range(max(0, file_index - 1), min(8, file_index + 2)):
-                for rank in range(max(0, rank_index - 1), rank_index + 1):
-                    check_square = rank * 8 + file
-                    piece = self.board.piece_at(check_square)
-                    if piece and piece.piece_type == 1 and not piece.color:  # black pawn
-                        shield_bonus += king_pawn_shield_scores[min(5, file)]
-
+        for mask, score in KING_SHIELD_MASKS[is_white][square]:
+            shield_bonus += score * chess.popcount(mask & own_pawns)
         return shield_bonus
 
-    def make_bot_move(self, max_depth=6, time_limit_seconds=5):
-        """AI makes the best move using iterative deepening with transposition table"""
-        best_move = self.iterative_deepening(max_depth, time_limit_seconds)
+    def make_bot_move(self, max_depth=6, time_limit_seconds=5, threads=1, parallel='lazy_smp'):
+        """AI makes the best move using iterative deepening with transposition table.
+
+        threads > 1 searches in parallel worker processes: parallel='lazy_smp'
+        shares the transposition table with threads - 1 helpers, and
+        'root_split' splits the root moves over a pool of threads workers
+        (see iterative_deepening()). After a parallel search, call close()
+        when the bot is no longer needed, to release the shared memory and
+        the worker pool.
+        """
+        best_move = self.iterative_deepening(max_depth, time_limit_seconds, threads, parallel)
         if best_move:
             self.board.push(best_move)
             self.switch_player()
             return best_move
         return None
 
-    def iterative_deepening(self, max_depth, time_limit_seconds):
-        """Iterative deepening: gradually increase search depth until time limit"""
+    def iterative_deepening(self, max_depth, time_limit_seconds, threads=1, parallel='lazy_smp'):
+        """Iterative deepening: gradually increase search depth until time limit.
+
+        With threads > 1 the search runs in parallel. parallel='lazy_smp'
+        starts threads - 1 helper processes that search the same root
+        alongside this one, sharing the transposition table through shared
+        memory. parallel='root_split' splits the root moves over a pool of
+        threads processes and gives reproducible results.
+        """
+        self.transposition_table.new_search()
+        self.eval_cache.reset_stats()
+        self.pawn_hash.reset_stats()
+        self._reset_search_stats()
+        if threads > 1:
+            if parallel == 'lazy_smp':
+                return self._lazy_smp_search(max_depth, time_limit_seconds, threads)
+            if parallel == 'root_split':
+                return self._root_split_search(max_depth, time_limit_seconds, threads)
+            raise ValueError(f"Unknown parallel mode: {parallel!r}")
+        best_move, _, _ = self._iterative_deepening(max_depth, time_limit_seconds)
+        return best_move
+
+    def _iterative_deepening(self, max_depth, time_limit_seconds, start_depth=1):
+        """Run the deepening loop and return (best_move, completed_depth, score).
+
+        After the first iteration each one starts with an aspiration window
+        around the previous score and widens it on the side that failed
+        until the score falls inside. self.iteration_stats records the
+        re-searches of every iteration.
+        """
         start_time = time.time()
         best_move = None
-        depth = 1
+        best_score = None
+        completed_depth = 0
+        depth = start_depth
+        root_board = self.prepare_search()
+        self.iteration_stats = []
 
-        while depth <= max_depth:
-            elapsed_time = time.time() - start_time
+        try:
+            while depth <= max_depth:
+                if self._should_stop(start_time, time_limit_seconds):
+                    break  # Time limit exceeded
 
-            if elapsed_time >= time_limit_seconds:
-                break  # Time limit exceeded
+                # Do NOT clear the transposition table between iterations; reuse stored info
+                if best_score is None or abs(best_score) >= MATE_BOUND:
+                    window = None
+                    alpha, beta = float("-inf"), float("inf")
+                else:
+                    window = ASPIRATION_WINDOW
+                    alpha, beta = best_score - window, best_score + window
+                stats = {'depth': depth, 'score': None, 'window': window, 'fail_lows': 0, 'fail_highs': 0}
+                self.iteration_stats.append(stats)
+                low_window = high_window = window
 
-            # Do NOT clear the transposition table between iterations; reuse stored info
-            move, _ = self.search(depth, float("-inf"), float("inf"), self.board.turn, start_time, time_limit_seconds)
+                while True:
+                    move, score = self.search(depth, alpha, beta, self.board.turn, start_time, time_limit_seconds)
+                    if move is None or self._should_stop(start_time, time_limit_seconds):
+                        break
+                    if score <= alpha:
+                        # Fail low: the root move may be worse than thought,
+                        # so its move cannot be trusted until re-searched
+                        stats['fail_lows'] += 1
+                        low_window *= 2
+                        alpha = best_score - low_window if low_window <= ASPIRATION_MAX_WINDOW else float("-inf")
+                    elif score >= beta:
+                        stats['fail_highs'] += 1
+                        high_window *= 2
+                        beta = best_score + high_window if high_window <= ASPIRATION_MAX_WINDOW else float("inf")
+                    else:
+                        break
+                stats['score'] = score
+                stats['pv'] = list(self.search_stack[0].pv)
+                if move is not None and score <= alpha:
+                    move = None  # interrupted during a fail-low re-search
 
-            if move is not None:
-                best_move = move
+                if move is not None:
+                    best_move = move
+                    best_score = score
+                    if not self._should_stop(start_time, time_limit_seconds):
+                        completed_depth = depth
+
+                depth += 1
+        finally:
+            self.board = root_board
+
+        return best_move, completed_depth, best_score
+
+    def _should_stop(self, start_time, time_limit):
+        """True once the time budget is spent or the main process raised stop_flag."""
+        if self.stop_flag is not None and self.stop_flag.value:
+            return True
+        return start_time is not None and time_limit is not None and time.time() - start_time >= time_limit
+
+    def _share_transposition_table(self):
+        """Move the TT into shared memory (once) so helper processes can attach to it."""
+        if self.shared_memory is None:
+            local = self.transposition_table
+            self.shared_memory = shared_memory.SharedMemory(create=True, size=local.nbytes)
+            shared = TranspositionTable(local.size_mb, buffer=self.shared_memory.buf)
+            shared.table[:] = local.table  # keep what we already learned
+            shared.generation = local.generation
+            local.release()
+            self.transposition_table = shared
+        return self.shared_memory
 
-            depth += 1
+    def _lazy_smp_search(self, max_depth, time_limit_seconds, threads):
+        """Search with threads - 1 helper processes and return the deepest result.
 
+        Helpers start from staggered depths and with perturbed history scores,
+        so they explore the tree in different orders and fill the shared TT
+        with entries the main search then hits. When the main search ends it
+        raises the stop flag; the move from the deepest completed iteration
+        wins, preferring the main process on ties. Helpers that do not report
+        within HELPER_STOP_TIMEOUT are terminated and left out.
+        """
+        shm = self._share_transposition_table()
+        stop_flag = multiprocessing.RawValue('b', 0)
+        results = multiprocessing.Queue()
+        helpers = []
+        for worker_id in range(1, threads):
+            process = multiprocessing.Process(
+                target=_lazy_smp_worker,
+                args=(worker_id, self.board.copy(), shm.name, self.transposition_table.size_mb,
+                      self.transposition_table.generation, max_depth, time_limit_seconds,
+                      stop_flag, results),
+                daemon=True,
+            )
+            process.start()
+            helpers.append(process)
+
+        best_move, best_depth, _ = self._iterative_deepening(max_depth, time_limit_seconds)
+        stop_flag.value = 1
+
+        # A helper killed before it could report would block a plain get()
+        # forever, so poll, and give up once none is alive or time runs out
+        deadline = time.time() + HELPER_STOP_TIMEOUT
+        pending = len(helpers)
+        while pending and time.time() < deadline:
+            # Checked before get(): a helper that has exited has already
+            # flushed its report into the queue
+            alive = any(process.is_alive() for process in helpers)
+            try:
+                worker_id, move, depth, _ = results.get(timeout=0.05)
+            except queue.Empty:
+                if not alive:
+                    break
+                continue
+            pending -= 1
+            if move is not None and depth > best_depth:
+                best_move, best_depth = move, depth
+        for process in helpers:
+            process.join(timeout=max(0.0, deadline - time.time()))
+            if process.is_alive():
+                process.terminate()
+                process.join()
         return best_move
 
+    def save_transposition_table(self, path):
+        """Snapshot the transposition table to path for a later warm start."""
+        self.transposition_table.save(path)
+
+    def load_transposition_table(self, path):
+        """Warm-start from a snapshot written by save_transposition_table().
+
+        Returns False, keeping the current table, when the file is missing
+        or was written by a different engine or evaluation version.
+        """
+        try:
+            table = TranspositionTable.load(path)
+        except (OSError, ValueError):
+            return False
+        self.close()
+        self.transposition_table.release()
+        self.transposition_table = table
+        return True
+
+    def _root_split_pool(self, threads):
+        """Return the root-splitting process pool, (re)creating it for threads workers."""
+        if self.root_split_pool is not None and self.root_split_threads != threads:
+            self.root_split_pool.shutdown()
+            self.root_split_pool = None
+        if self.root_split_pool is None:
+            self.root_split_threads = threads
+            self.root_split_alpha = multiprocessing.Value('q', 0)
+            self.root_split_pool = ProcessPoolExecutor(
+                max_workers=threads,
+                initializer=_root_split_init,
+                initargs=(self.root_split_alpha, self.transposition_table.size_mb),
+            )
+        return self.root_split_pool
+
+    def _root_split_search(self, max_depth, time_limit_seconds, threads):
+        """Iterative deepening that splits each iteration's root moves over a process pool.
+
+        Young Brothers Wait style: the first move from order_moves() is
+        searched here with a full window to establish alpha. The remaining
+        moves are dealt round-robin to threads workers, which test them with
+        null windows and publish improvements through a shared alpha. Moves
+        that fail high are then re-searched here, in root order, with an
+        open window.
+
+        The result is reproducible for a given worker count: the split is
+        static, every task starts from an empty table, and fail-highs are
+        resolved in root order, so process scheduling only changes how
+        tight the workers' null windows get, not which move wins.
+        """
+        start_time = time.time()
+        deadline = start_time + time_limit_seconds
+        pool = self._root_split_pool(threads)
+        best_move = None
+        root_board = self.prepare_search()
+
+        try:
+            for depth in range(1, max_depth + 1):
+                if self._should_stop(start_time, time_limit_seconds):
+                    break
+
+                moves = self.order_moves(list(self.board.legal_moves))
+                if not moves:
+                    break
+
+                iteration_move = moves[0]
+                self._make_move(iteration_move)
+                _, score = self.search(depth - 1, float('-inf'), float('inf'), self.board.turn, start_time, time_limit_seconds)
+                self._unmake_move()
+                alpha = -score
+                self.root_split_alpha.value = int(alpha)
+
+                indexed = list(enumerate(moves))[1:]
+                futures = [
+                    pool.submit(_root_split_worker, root_board.copy(), indexed[worker::threads], depth, alpha, deadline)
+                    for worker in range(threads)
+                    if indexed[worker::threads]
+                ]
+                fail_highs = sorted(index for future in futures for index in future.result())
+
+                for index in fail_highs:
+                    move = moves[index]
+                    self._make_move(move)
+                    _, score = self.search(depth - 1, float('-inf'), -alpha, self.board.turn, start_time, time_limit_seconds)
+                    self._unmake_move()
+                    if -score > alpha:
+                        alpha = -score
+                        iteration_move = move
+
+                if self._should_stop(start_time, time_limit_seconds) and best_move is not None:
+                    break  # incomplete iteration; keep the previous depth's move
+                best_move = iteration_move
+                # Exact root entry so the next iteration orders this move first
+                self.transposition_table.store(self.generate_transposition_key(), depth, alpha, 'EXACT', best_move)
+        finally:
+            self.board = root_board
+
+        return best_move
+
+    def close(self):
+        """Release the shared-memory TT and worker pool, if a parallel search created them."""
+        if self.root_split_pool is not None:
+            self.root_split_pool.shutdown()
+            self.root_split_pool = None
+            self.root_split_alpha = None
+        if self.shared_memory is not None:
+            local = TranspositionTable(self.transposition_table.size_mb)
+            local.table = array('Q', self.transposition_table.table.tobytes())
+            local.generation = self.transposition_table.generation
+            self.transposition_table.release()
+            self.transposition_table = local
+            self.shared_memory.close()
+            self.shared_memory.unlink()
+            self.shared_memory = None
+
     def generate_transposition_key(self):
-        """Generate a unique key for the current board state"""
-        # Use board FEN as key (simpler but effective)
-        return self.board.fen()
+        """Generate a 64-bit key for the current board state.
+
+        Uses the Polyglot Zobrist hash, which covers pieces, side to move,
+        castling rights and capturable en passant squares but not the
+        halfmove/fullmove counters, so transpositions reached at different
+        move numbers share an entry. During a search the SearchBoard keeps
+        it up to date incrementally.
+        """
+        if isinstance(self.board, SearchBoard):
+            return self.board.zobrist
+        return chess.polyglot.zobrist_hash(self.board)
 
     def quiescence(self, alpha, beta):
-        """Quiescence search: only consider captures/promotions to avoid horizon effect."""
-        stand_pat = self.evaluate()
+        """Quiescence search: only consider captures/promotions to avoid horizon effect.
+
+        Results go into the transposition table at depth 0 (QSEARCH_DEPTH),
+        where they give cutoffs to later quiescence and depth-0 searches
+        and their best capture is tried first, but never replace an entry
+        from a deeper search.
+        """
+        self.nodes += 1
+        self.qnodes += 1
+        board = self.board
+        ply = len(board.undo_stack)
+        transposition_key = self.generate_transposition_key()
+        tt_hit = self.transposition_table.lookup(transposition_key, QSEARCH_DEPTH, alpha, beta, ply)
+        if tt_hit is not None:
+            tt_move, tt_eval, tt_flag = tt_hit
+            if tt_move is None or board.is_legal(tt_move):
+                return tt_eval
+        tt_entry = self.transposition_table.probe(transposition_key, ply)
+        tt_move = tt_entry[3] if tt_entry else None
+
+        stand_pat = self._static_eval(transposition_key)
         if stand_pat >= beta:
             return beta
+        original_alpha = alpha
         if alpha < stand_pat:
             alpha = stand_pat
 
-        # Only consider capture moves in quiescence
-        for move in sorted(self.board.legal_moves, key=lambda m: -self._score_move_mvv_lva(m)):
-            if not self.board.is_capture(move) and not move.promotion:
+        # Only captures and promotions are generated (capturing evasions when
+        # in check), pseudo-legally; legality is tested per move only once it
+        # is known to be worth searching
+        safety = KingSafety(board)
+        checkers = safety.checkers
+        if checkers:
+            moves = safety.evasions()[0]
+        else:
+            moves = self._generate_captures()
+        moves.sort(key=self._score_move_mvv_lva, reverse=True)
+        # The stored best capture goes first; being in the generated list
+        # also vouches for it, so a colliding entry's move is never played
+        if tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+
+        best_move = None
+
+        for move in moves:
+            if not checkers:
+                # Delta pruning: even winning the victim outright (plus a
+                # positional margin) would not lift the score to alpha
+                if stand_pat + self._capture_gain(move) + DELTA_MARGIN <= alpha:
+                    continue
+                # Captures that lose material by SEE cannot improve on
+                # standing pat
+                if self._is_losing_capture(move):
+                    continue
+            if not safety.is_safe(move):
                 continue
-            self.board.push(move)
+            self._make_move(move)
             score = -self.quiescence(-beta, -alpha)
-            self.board.pop()
+            self._unmake_move()
 
             if score >= beta:
+                self.transposition_table.store(transposition_key, QSEARCH_DEPTH, beta, 'LOWER', move, ply)
                 return beta
             if score > alpha:
                 alpha = score
+                best_move = move
 
+        flag = 'EXACT' if alpha > original_alpha else 'UPPER'
+        self.transposition_table.store(transposition_key, QSEARCH_DEPTH, alpha, flag, best_move, ply)
         return alpha
 
-    def search(self, depth, alpha, beta, is_maximizing, start_time=None, time_limit=None):
-        """Negamax-style search with alpha-beta, transposition table, move ordering and quiescence."""
+    def search(self, depth, alpha, beta, is_maximizing, start_time=None, time_limit=None, allow_null=True):
+        """Negamax alpha-beta principal variation search; returns (best_move, score) for the side to move.
+
+        Uses the transposition table, quiescence at depth 0 and the pruning
+        and reductions described with their constants at the top of the file.
+        """
         # Time cutoff
-        if start_time is not None and time_limit is not None:
-            if time.time() - start_time >= time_limit:
-                return None, 0
+        if self._should_stop(start_time, time_limit):
+            return None, 0
+        # Leaves are counted by quiescence(), which they hand off to below
+        if depth > 0:
+            self.nodes += 1
+
+        # Draws by rule, read straight off the board. Never at the root,
+        # which must always return a move.
+        board = self.board
+        ply = len(board.undo_stack)
+        frame = self._search_ply(ply)
+        frame.pv.clear()
+        if board.undo_stack:
+            if board.halfmove_clock >= 100 or board.is_repetition_draw() or board.is_insufficient_material():
+                return None, DRAW_SCORE
+            # A move that repeats an earlier position in this search is
+            # available, so this node is worth at least a draw
+            if alpha < DRAW_SCORE and board.has_upcoming_repetition():
+                alpha = DRAW_SCORE
+                if alpha >= beta:
+                    return None, alpha
+
+        if depth == 0:
+            # Quiescence at the leaves; it probes the TT and stores its own result
+            return None, self.quiescence(alpha, beta)
 
         transposition_key = self.generate_transposition_key()
 
-        # TT lookup
-        tt_hit = self.transposition_table.lookup(transposition_key, depth, alpha, beta)
+        # TT lookup. No cutoff at the root, so every iteration builds its PV
+        tt_hit = self.transposition_table.lookup(transposition_key, depth, alpha, beta, ply) if ply else None
         if tt_hit is not None:
             tt_move, tt_eval, tt_flag = tt_hit
-            return tt_move, tt_eval
+            # An illegal stored move means the entry belongs to another
+            # position that collided with this one, so ignore it entirely
+            if tt_move is None or self.board.is_legal(tt_move):
+                return tt_move, tt_eval
+        tt_entry = self.transposition_table.probe(transposition_key, ply)
+        tt_move = tt_entry[3] if tt_entry else None
 
-        if depth == 0 or self.board.is_game_over():
-            # Use quiescence at leaf
-            eval_score = self.quiescence(alpha, beta) if depth == 0 else self.evaluate()
-            self.transposition_table.store(transposition_key, depth, eval_score, 'EXACT', None)
-            return None, eval_score
+        in_check = bool(board.checkers_mask())
+        static_eval = None if in_check else self._static_eval(transposition_key)
+        frame.static_eval = static_eval
+        # Improving: the static eval has risen since this side's previous move
+        improving = (static_eval is not None and ply >= 2 and self.search_stack[ply - 2].static_eval is not None
+                     and static_eval > self.search_stack[ply - 2].static_eval)
+        if (static_eval is not None and depth <= PRUNING_MAX_DEPTH and board.undo_stack
+                and beta - alpha == 1 and -MATE_BOUND < alpha):
+            if static_eval - REVERSE_FUTILITY_MARGIN * (depth - improving) >= beta and beta < MATE_BOUND:
+                self.reverse_futility_prunes += 1
+                return None, static_eval
+            if depth < len(RAZOR_MARGINS) and static_eval + RAZOR_MARGINS[depth] <= alpha:
+                score = self.quiescence(alpha, beta)
+                if score <= alpha:
+                    self.razor_prunes += 1
+                    return None, score
+
+        if (allow_null and depth >= NULL_MOVE_MIN_DEPTH and board.undo_stack and beta < MATE_BOUND
+                and board.occupied_co[board.turn] & ~(board.pawns | board.kings)
+                and static_eval is not None and static_eval >= beta):
+            reduction = NULL_MOVE_REDUCTION + (depth >= NULL_MOVE_VERIFY_DEPTH)
+            self._make_null_move()
+            _, null_score = self.search(depth - 1 - reduction, -beta, -beta + 1, not is_maximizing,
+                                        start_time, time_limit, allow_null=False)
+            self._unmake_move()
+            null_score = -null_score
+            if null_score >= beta and not self._should_stop(start_time, time_limit):
+                # A mate found after passing is not a real mate
+                null_score = min(null_score, MATE_BOUND - 1)
+                if depth >= NULL_MOVE_VERIFY_DEPTH:
+                    _, null_score = self.search(depth - reduction, beta - 1, beta, is_maximizing,
+                                                start_time, time_limit, allow_null=False)
+                if null_score >= beta and not self._should_stop(start_time, time_limit):
+                    self.null_move_cutoffs += 1
+                    return None, null_score
+
+        if not in_check and board.undo_stack and beta - alpha == 1 and abs(beta) < MATE_BOUND:
+            if self.use_probcut and depth >= PROBCUT_MIN_DEPTH:
+                move, score = self._probcut(depth, beta, tt_entry, transposition_key,
+                                            is_maximizing, start_time, time_limit)
+                if move is not None:
+                    self.probcut_prunes += 1
+                    return move, score
+            if self.use_multicut and depth >= MULTICUT_MIN_DEPTH and static_eval >= beta:
+                score = self._multi_cut(depth, beta, tt_entry, tt_move, is_maximizing, start_time, time_limit)
+                if score is not None:
+                    self.multicut_prunes += 1
+                    return None, score
 
         best_move = None
         best_eval = float('-inf')
+        has_legal_move = False
+        stopped = False
+        original_alpha = alpha
+        child = self.search_stack[ply + 1]
+        # Killers two plies down are about to be relearned for this subtree
+        grandchild = self._search_ply(ply + 2)
+        grandchild.killer1 = grandchild.killer2 = None
+        can_reduce = depth >= LMR_MIN_DEPTH and not in_check
+        futility_base = (static_eval + FUTILITY_MARGIN * depth
+                         if static_eval is not None and depth <= PRUNING_MAX_DEPTH and board.undo_stack else None)
+        late_move_count = (LATE_MOVE_COUNTS[depth]
+                           if not in_check and board.undo_stack and depth < len(LATE_MOVE_COUNTS) else None)
+        moves_searched = 0
 
-        moves = list(self.board.legal_moves)
-        moves = self.order_moves(moves, depth)
-
-        for move in moves:
+        for move in self.staged_moves(ply, tt_move):
             # Time cutoff during long searches
-            if start_time is not None and time_limit is not None and time.time() - start_time >= time_limit:
+            if self._should_stop(start_time, time_limit):
+                stopped = True
                 break
 
-            self.board.push(move)
-            _, eval_score = self.search(depth - 1, -beta, -alpha, not is_maximizing, start_time, time_limit)
-            if eval_score is None:
-                # time cutoff propagated
-                self.board.pop()
+            quiet = not move.promotion and not board.is_capture(move)
+            if (quiet and late_move_count is not None and moves_searched >= late_move_count
+                    and best_eval > -MATE_BOUND):
+                # Late move pruning: history-ordered quiet moves this late
+                # almost never matter this close to the leaves
+                self.late_move_prunes += 1
+                has_legal_move = True
+                continue
+            reduction = 0
+            if (can_reduce and moves_searched >= LMR_MIN_MOVES and quiet
+                    and move != tt_move and move != frame.killer1 and move != frame.killer2):
+                reduction = LMR_REDUCTIONS[min(depth, LMR_TABLE_SIZE - 1)][min(moves_searched, LMR_TABLE_SIZE - 1)]
+                # Always leave at least one ply before quiescence
+                reduction = min(reduction, depth - 2)
+            futile = quiet and futility_base is not None and futility_base <= alpha and alpha < MATE_BOUND
+            self._make_move(move)
+            if futile and not board.is_check():
+                # Futility pruning: count the move as scoring at most the margin
+                self._unmake_move()
+                self.futility_prunes += 1
+                has_legal_move = True
+                best_eval = max(best_eval, futility_base)
+                continue
+            moves_searched += 1
+            if reduction and board.is_check():
+                reduction = 0
+            if not has_legal_move or alpha == float('-inf'):
+                _, eval_score = self.search(depth - 1, -beta, -alpha, not is_maximizing, start_time, time_limit)
+            else:
+                if reduction:
+                    self.lmr_reductions += 1
+                    _, eval_score = self.search(depth - 1 - reduction, -alpha - 1, -alpha, not is_maximizing,
+                                                start_time, time_limit)
+                    if -eval_score > alpha:
+                        self.lmr_researches += 1
+                        reduction = 0
+                if not reduction:
+                    _, eval_score = self.search(depth - 1, -alpha - 1, -alpha, not is_maximizing, start_time, time_limit)
+                if alpha < -eval_score < beta:
+                    self.pvs_researches += 1
+                    _, eval_score = self.search(depth - 1, -beta, -alpha, not is_maximizing, start_time, time_limit)
+            has_legal_move = True
+            self._unmake_move()
+            if self._should_stop(start_time, time_limit):
+                # The child search was cut short, so its score means nothing
+                stopped = True
                 break
             eval_score = -eval_score
-            self.board.pop()
 
             if eval_score > best_eval:
                 best_eval = eval_score
@@ -340,24 +1762,174 @@ class ChessBot:
 
             if eval_score > alpha:
                 alpha = eval_score
+                pv = frame.pv
+                pv.clear()
+                pv.append(move)
+                pv.extend(child.pv)
 
             if alpha >= beta:
-                # Beta cutoff: store killer move
-                if depth < len(self.killer_moves):
-                    self.killer_moves[depth] = move
+                # Beta cutoff: quiet moves become this ply's killers
+                if quiet:
+                    frame.add_killer(move)
                 # store as LOWER bound
-                self.transposition_table.store(transposition_key, depth, best_eval, 'LOWER', best_move)
+                self.transposition_table.store(transposition_key, depth, best_eval, 'LOWER', best_move, ply)
                 # update history heuristic
                 self.history_table[move.from_square // 8][move.from_square % 8] += 1
                 return best_move, best_eval
 
-        # If we exit the loop normally, store as EXACT
-        flag = 'EXACT'
-        self.transposition_table.store(transposition_key, depth, best_eval if best_eval != float('-inf') else self.evaluate(), flag, best_move)
+        if stopped:
+            # Out of time: the node is neither terminal nor searched, so
+            # report what was found so far and store nothing
+            return best_move, best_eval if best_move is not None else 0
+
+        if not has_legal_move:
+            # No legal moves: checkmate or stalemate
+            eval_score = -MATE_SCORE + ply if in_check else DRAW_SCORE
+            self.transposition_table.store(transposition_key, depth, eval_score, 'EXACT', None, ply)
+            return None, eval_score
+
+        # If we exit the loop normally the score is exact, unless no move
+        # beat alpha, in which case it is only an upper bound (null-window
+        # searches fail low all the time, and must not be mistaken for exact)
+        flag = 'EXACT' if best_eval > original_alpha else 'UPPER'
+        self.transposition_table.store(transposition_key, depth, best_eval if best_eval != float('-inf') else self.cached_evaluate(transposition_key), flag, best_move, ply)
         return best_move, best_eval
 
+    def _probcut(self, depth, beta, tt_entry, transposition_key, is_maximizing, start_time, time_limit):
+        """ProbCut: look for a capture that beats beta by PROBCUT_MARGIN in a reduced search.
+
+        Captures that do not lose material by SEE are tried in MVV-LVA order,
+        each verified by quiescence before the reduced search. A TT entry
+        searched at least as deep that bounds the score below the raised
+        beta skips the attempt, and a success is stored as a lower bound at
+        the reduced depth for the next visit. Returns (move, score), or
+        (None, None) when the node is not cut.
+        """
+        board = self.board
+        probcut_beta = beta + PROBCUT_MARGIN
+        probcut_depth = depth - PROBCUT_REDUCTION
+        if tt_entry is not None:
+            tt_depth, tt_eval, tt_flag, _ = tt_entry
+            if tt_depth >= probcut_depth and tt_flag != 'LOWER' and tt_eval < probcut_beta:
+                return None, None
+
+        safety = KingSafety(board)
+        captures = self._generate_captures()
+        captures.sort(key=self._score_move_mvv_lva, reverse=True)
+        for move in captures:
+            if self._is_losing_capture(move) or not safety.is_safe(move):
+                continue
+            self._make_move(move)
+            score = -self.quiescence(-probcut_beta, -probcut_beta + 1)
+            if score >= probcut_beta:
+                _, score = self.search(probcut_depth - 1, -probcut_beta, -probcut_beta + 1, not is_maximizing,
+                                       start_time, time_limit)
+                score = -score
+            self._unmake_move()
+            if self._should_stop(start_time, time_limit):
+                break
+            if score >= probcut_beta:
+                self.transposition_table.store(transposition_key, probcut_depth, score, 'LOWER', move, len(board.undo_stack))
+                return move, score
+        return None, None
+
+    def _multi_cut(self, depth, beta, tt_entry, tt_move, is_maximizing, start_time, time_limit):
+        """Multi-cut: return beta if several of the first moves fail high in a reduced search, else None.
+
+        Only tried where the TT does not mark the node as failing low (an
+        upper bound below beta); the reduced searches store their own
+        entries, which the full search then reuses.
+        """
+        if tt_entry is not None and tt_entry[2] == 'UPPER' and tt_entry[1] < beta:
+            return None
+        cutoffs = 0
+        for index, move in enumerate(self.staged_moves(len(self.board.undo_stack), tt_move)):
+            if index == MULTICUT_MOVES:
+                break
+            self._make_move(move)
+            _, score = self.search(depth - 1 - MULTICUT_REDUCTION, -beta, -beta + 1, not is_maximizing,
+                                   start_time, time_limit)
+            self._unmake_move()
+            if self._should_stop(start_time, time_limit):
+                return None
+            if -score >= beta:
+                cutoffs += 1
+                if cutoffs == MULTICUT_CUTOFFS:
+                    return beta
+        return None
+
+
+def _lazy_smp_worker(worker_id, board, shm_name, size_mb, generation, max_depth,
+                     time_limit_seconds, stop_flag, results):
+    """Lazy SMP helper process: search board against the shared TT and report back."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    table = TranspositionTable(size_mb, buffer=shm.buf)
+    table.generation = generation
+    move, depth, score = None, 0, None
+    try:
+        bot = ChessBot(transposition_table=table)
+        bot.board = board
+        bot.stop_flag = stop_flag
+        # Stagger helpers: odd workers skip depth 1, and per-worker history
+        # noise breaks ordering ties differently in every process
+        rng = random.Random(worker_id)
+        bot.history_table = [[rng.randint(0, worker_id) for _ in range(8)] for _ in range(8)]
+        move, depth, score = bot._iterative_deepening(max_depth, time_limit_seconds,
+                                                      start_depth=1 + worker_id % 2)
+    finally:
+        # Always report, even on error, so the main process never waits forever
+        results.put((worker_id, move, depth, score))
+        table.release()
+        shm.close()
+
+
+# Per-process state of root-splitting pool workers, set by _root_split_init()
+_root_split_alpha = None
+_root_split_hash_mb = None
+
+
+def _root_split_init(shared_alpha, hash_size_mb):
+    """ProcessPoolExecutor initializer: remember the shared alpha and table size."""
+    global _root_split_alpha, _root_split_hash_mb
+    _root_split_alpha = shared_alpha
+    _root_split_hash_mb = hash_size_mb
+
+
+def _root_split_worker(board, moves, depth, alpha, deadline):
+    """Null-window test each (index, move) against the shared alpha.
+
+    Returns the root indices of the moves that failed high. Each fail-high
+    raises the shared alpha to one below its bound, so a later move with an
+    equal score still fails high and ties are settled by root order.
+    """
+    bot = ChessBot(transposition_table=TranspositionTable(_root_split_hash_mb))
+    bot.board = board
+    bot.prepare_search()  # the pool worker's bot is thrown away, so no need to restore
+    start_time = time.time()
+    time_limit = deadline - start_time
+    fail_highs = []
+
+    for index, move in moves:
+        bound = max(alpha, _root_split_alpha.value)
+        bot._make_move(move)
+        _, score = bot.search(depth - 1, -bound - 1, -bound, bot.board.turn, start_time, time_limit)
+        bot._unmake_move()
+        if bot._should_stop(start_time, time_limit):
+            break
+        score = -score
+        if score > bound:
+            fail_highs.append(index)
+            with _root_split_alpha.get_lock():
+                if score - 1 > _root_split_alpha.value:
+                    _root_split_alpha.value = int(score - 1)
+
+    return fail_highs
+
+
 if __name__ == "__main__":
     bot = ChessBot()
+    # Deep enough that the time limit, not the depth, ends each search
+    search_depth = 64
     
     print("=" * 60)
     print("Welcome to Chess Bot!")
@@ -422,7 +1994,7 @@ if __name__ == "__main__":
                 continue
             
             print("Bot is thinking...")
-            bot_move = bot.make_bot_move(max_depth=3, time_limit_seconds=5)
+            bot_move = bot.make_bot_move(max_depth=search_depth, time_limit_seconds=5)
             
             if bot_move:
                 print(f"White plays: {bot_move}")
@@ -436,7 +2008,7 @@ if __name__ == "__main__":
                 continue
             
             print("Bot is thinking...")
-            bot_move = bot.make_bot_move(max_depth=3, time_limit_seconds=5)
+            bot_move = bot.make_bot_move(max_depth=search_depth, time_limit_seconds=5)
             
             if bot_move:
                 print(f"Black plays: {bot_move}")
@@ -0,0 +1,39 @@
+import chess
+import pytest
+
+from chess_bot import ChessBot
+
+
+# evaluate() scores of the original piece-by-piece implementation
+EVALUATIONS = [
+    (chess.STARTING_FEN, 0),
+    ("r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4", 0),
+    ("2r2rk1/1bqnbppp/p2ppn2/1p6/3NP3/1BN1BP2/PPPQ2PP/2KR3R w - - 0 13", 2),
+    ("r1bq1rk1/pp2ppbp/2np1np1/8/3NP3/2N1BP2/PPPQ2PP/R3KB1R w KQ - 0 9", -6),
+    ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", 0),
+    ("8/8/4k3/3p4/3P4/4K3/8/8 w - - 0 1", 0),
+    ("r3r1k1/pp3pp1/2p2q1p/3p4/3P4/2P1PQ2/PP3PPP/R4RK1 w - - 0 1", 4),
+    ("8/5ppp/8/8/8/8/PPP5/1k2K3 w - - 0 1", 0),
+    ("6k1/5ppp/8/8/8/8/PPP5/4K3 w - - 0 1", -9),
+    ("8/1P6/8/2k5/8/5K2/6p1/8 b - - 0 1", 0),
+    ("4k3/p1p3p1/8/3P4/8/8/P5PP/4K3 w - - 0 1", 26),
+    ("2kr4/ppp5/8/8/8/8/5PPP/6K1 b - - 0 1", -7),
+]
+
+
+def test_pawn_hash_does_not_alias_king_squares():
+    # A king on g8 and one on b1 used to share a pawn-hash entry
+    bot = ChessBot()
+    bot.board = chess.Board("6k1/5ppp/8/8/8/8/PPP5/4K3 w - - 0 1")
+    assert bot.evaluate() == -9
+    bot.board = chess.Board("8/5ppp/8/8/8/8/PPP5/1k2K3 w - - 0 1")
+    assert bot.evaluate() == 0
+
+
+@pytest.mark.parametrize("fen, expected", EVALUATIONS)
+def test_evaluate_matches_original_implementation(fen, expected):
+    bot = ChessBot()
+    bot.board = chess.Board(fen)
+    assert bot.evaluate() == expected
+    bot.prepare_search()
+    assert bot.evaluate() == expected
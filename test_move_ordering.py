@@ -0,0 +1,83 @@
+import chess
+import pytest
+
+from chess_bot import ChessBot
+
+
+POSITIONS = [
+    chess.STARTING_FEN,
+    "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+]
+
+# Positions where the side to move is in check, including double check
+CHECK_POSITIONS = [
+    "rnbqkbnr/ppp2ppp/8/1B1pp3/4P3/8/PPPP1PPP/RNBQK1NR b KQkq - 1 3",
+    "4k3/8/8/8/8/5n2/8/r3K3 w - - 0 1",
+    "4k3/8/8/8/1b6/8/8/4K2R w K - 0 1",
+    "8/8/8/2k5/3Pp3/8/8/4K3 b - d3 0 1",
+]
+
+# Static exchange results in mvv_lva units
+SEE_CASES = [
+    ("1k1r4/1pp4p/p7/4p3/8/P5P1/1PP4P/2K1R3 w - - 0 1", "e1e5", 1),
+    ("1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1", "d3e5", -2),
+    ("4k3/8/1n6/3p4/8/8/8/3QK3 w - - 0 1", "d1d5", -8),
+    ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1", "e5d6", 1),
+    ("r3k3/1P6/8/8/8/8/8/4K3 w - - 0 1", "b7b8q", -1),
+    ("4k3/3p4/8/8/8/8/8/3RK3 w - - 0 1", "d1d7", -4),
+    # The queen x-rays through the rook, so the king cannot recapture
+    ("4k3/3p4/8/8/8/8/3R4/3QK3 w - - 0 1", "d2d7", 1),
+    ("3rk3/8/8/8/3p4/8/3R4/3RK3 w - - 0 1", "d2d4", 1),
+]
+
+
+def _searching_bot(fen):
+    bot = ChessBot()
+    bot.board = chess.Board(fen)
+    bot.prepare_search()
+    return bot
+
+
+@pytest.mark.parametrize("fen", POSITIONS + CHECK_POSITIONS)
+def test_staged_moves_are_the_legal_moves(fen):
+    bot = _searching_bot(fen)
+    staged = list(bot.staged_moves(0))
+    assert len(staged) == len(set(staged))
+    assert set(staged) == set(bot.board.legal_moves)
+
+
+@pytest.mark.parametrize("fen", POSITIONS + CHECK_POSITIONS)
+def test_staged_moves_with_tt_and_killer_moves(fen):
+    bot = _searching_bot(fen)
+    legal = list(bot.board.legal_moves)
+    quiets = [move for move in legal if not bot.board.is_capture(move) and not move.promotion]
+    frame = bot._search_ply(3)
+    frame.killer1 = quiets[-1] if quiets else None
+    # A killer from a sibling position that is not legal here
+    frame.killer2 = chess.Move.from_uci("a1a8")
+    staged = list(bot.staged_moves(3, tt_move=legal[len(legal) // 2]))
+    assert staged[0] == legal[len(legal) // 2]
+    assert len(staged) == len(set(staged))
+    assert set(staged) == set(legal)
+
+
+def test_staged_moves_skip_an_illegal_tt_move():
+    bot = _searching_bot(CHECK_POSITIONS[1])
+    staged = list(bot.staged_moves(0, tt_move=chess.Move.from_uci("e1d1")))
+    assert chess.Move.from_uci("e1d1") not in staged
+    assert set(staged) == set(bot.board.legal_moves)
+
+
+def test_staged_moves_checkmate_yields_nothing():
+    bot = _searching_bot("rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3")
+    assert list(bot.staged_moves(0)) == []
+
+
+@pytest.mark.parametrize("fen, uci, expected", SEE_CASES)
+def test_see(fen, uci, expected):
+    bot = _searching_bot(fen)
+    assert bot.see(chess.Move.from_uci(uci)) == expected
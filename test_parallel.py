@@ -0,0 +1,23 @@
+import os
+import time
+
+import chess
+
+import chess_bot
+from chess_bot import ChessBot
+
+
+def _dying_worker(*args):
+    os._exit(1)
+
+
+def test_lazy_smp_survives_a_helper_that_never_reports(monkeypatch):
+    monkeypatch.setattr(chess_bot, "_lazy_smp_worker", _dying_worker)
+    bot = ChessBot()
+    start = time.time()
+    try:
+        move = bot.iterative_deepening(3, 10, threads=2)
+    finally:
+        bot.close()
+    assert move in chess.Board().legal_moves
+    assert time.time() - start < 10
@@ -0,0 +1,73 @@
+import chess
+
+from chess_bot import ASPIRATION_WINDOW, MATE_SCORE, QSEARCH_DEPTH, ChessBot, TranspositionTable
+
+
+def test_leaf_nodes_are_counted_once():
+    bot = ChessBot()
+    bot.board = chess.Board("4k3/8/8/8/8/8/8/R3K3 w - - 0 1")
+    bot.iterative_deepening(1, 100)
+    # The root and its 15 children, which are all quiescence leaves
+    assert bot.nodes == 16
+    assert bot.qnodes == 15
+
+
+def test_mate_scores_count_plies_from_the_root():
+    bot = ChessBot()
+    bot.board = chess.Board("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+    assert bot.iterative_deepening(4, 100) == chess.Move.from_uci("a1a8")
+    # Mate on the first move, whatever depth found it
+    assert [stats["score"] for stats in bot.iteration_stats[1:]] == [MATE_SCORE - 1] * 3
+
+
+def test_tt_mate_scores_are_relative_to_the_node():
+    table = TranspositionTable(1)
+    # Mated at ply 5, stored by the node at ply 3: mated two plies below it
+    table.store(42, 4, -MATE_SCORE + 5, 'EXACT', None, ply=3)
+    assert table.probe(42, ply=3)[1] == -MATE_SCORE + 5
+    assert table.probe(42, ply=1)[1] == -MATE_SCORE + 3
+    assert table.lookup(42, 2, 0, 1, ply=7)[1] == -MATE_SCORE + 9
+
+
+def test_a_stopped_search_stores_nothing():
+    bot = ChessBot(hash_size_mb=1)
+    bot.board = chess.Board(chess.STARTING_FEN)
+    bot.prepare_search()
+    bot._should_stop = lambda *args: bot.nodes > 5
+    bot.search(3, float('-inf'), float('inf'), bot.board.turn)
+    # Only quiescence leaves finished before the stop; no interior node
+    # may record its partial result
+    table = bot.transposition_table
+    entries = [table._unpack(data) for data in table.table[1::2] if data]
+    assert all(depth == QSEARCH_DEPTH for depth, _, _, _ in entries)
+
+
+def test_iteration_stats_count_aspiration_failures():
+    bot = ChessBot()
+    bot.board = chess.Board("1rbqkb1r/pppppp2/B1n5/7p/4np1P/P4QR1/1PPPK1P1/RNB3N1 b - - 1 12")
+    bot.iterative_deepening(3, 100)
+    # Depth 1 runs with a full window; depth 2 drops below its window
+    # and depth 3 rises above it
+    assert [(stats["depth"], stats["window"], stats["fail_lows"], stats["fail_highs"])
+            for stats in bot.iteration_stats] == [(1, None, 0, 0), (2, ASPIRATION_WINDOW, 1, 0),
+                                          (3, ASPIRATION_WINDOW, 0, 1)]
+
+
+def test_iteration_stats_count_repeated_fail_highs():
+    bot = ChessBot()
+    bot.board = chess.Board("r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4")
+    bot.iterative_deepening(2, 100)
+    # Finding mate fails high until the window reaches the mate score
+    stats = bot.iteration_stats[-1]
+    assert stats["score"] == MATE_SCORE - 1
+    assert (stats["fail_lows"], stats["fail_highs"]) == (0, 5)
+
+
+def test_repeated_search_still_records_a_pv():
+    bot = ChessBot()
+    bot.board = chess.Board("r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4")
+    bot.iterative_deepening(4, 100)
+    # The second search finds every root result in the TT
+    move = bot.iterative_deepening(4, 100)
+    assert all(stats["pv"] for stats in bot.iteration_stats)
+    assert bot.iteration_stats[-1]["pv"][0] == move
@@ -0,0 +1,71 @@
+import random
+
+import chess
+import chess.polyglot
+import pytest
+
+from chess_bot import SearchBoard, _piece_code, pawn_king_key
+
+
+POSITIONS = [
+    chess.STARTING_FEN,
+    "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+]
+
+
+def _assert_same_position(search_board, board):
+    assert search_board.fen() == board.fen()
+    assert search_board.zobrist == chess.polyglot.zobrist_hash(board)
+    assert search_board.pawn_key == pawn_king_key(board)
+    for square in chess.SQUARES:
+        piece = board.piece_at(square)
+        expected = _piece_code(piece.piece_type, piece.color) if piece else 0
+        assert search_board.mailbox[square] == expected
+
+
+@pytest.mark.parametrize("fen", POSITIONS)
+def test_make_unmake_matches_push_pop(fen):
+    rng = random.Random(fen)
+    for _ in range(20):
+        board = chess.Board(fen)
+        search_board = SearchBoard.from_board(board)
+        for _ in range(40):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            move = rng.choice(moves)
+            board.push(move)
+            search_board.make(move)
+            _assert_same_position(search_board, board)
+        while search_board.undo_stack:
+            board.pop()
+            search_board.unmake()
+            _assert_same_position(search_board, board)
+
+
+def test_make_null_unmake_restores_position():
+    board = chess.Board(POSITIONS[2])
+    search_board = SearchBoard.from_board(board)
+    search_board.make_null()
+    board.push(chess.Move.null())
+    assert search_board.zobrist == chess.polyglot.zobrist_hash(board)
+    search_board.unmake()
+    board.pop()
+    _assert_same_position(search_board, board)
+
+
+@pytest.mark.parametrize("fen, ucis, expected", [
+    # 3...Nb8 returns to the position after 1...e5
+    (chess.STARTING_FEN, ["e2e4", "e7e5", "g1f3", "b8c6", "f3g1"], True),
+    # Rc6-b6 would restore the position after 1.Nc1, but White is to move
+    ("4k1n1/8/1r6/8/8/8/3KN3/8 w - - 0 1", ["e2c1", "b6b7", "d2d3", "b7c7", "d3d2", "c7c6"], False),
+])
+def test_has_upcoming_repetition(fen, ucis, expected):
+    search_board = SearchBoard.from_board(chess.Board(fen))
+    for uci in ucis:
+        search_board.make(chess.Move.from_uci(uci))
+    assert search_board.has_upcoming_repetition() == expected
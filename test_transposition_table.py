@@ -0,0 +1,120 @@
+import pytest
+
+import chess_bot
+from chess_bot import QSEARCH_DEPTH, ChessBot, TranspositionTable
+
+
+def _single_bucket_table():
+    # Zero megabytes still gets one bucket, so every key lands in it
+    table = TranspositionTable(0)
+    assert table.entries == TranspositionTable.BUCKET_SIZE
+    return table
+
+
+def test_full_bucket_evicts_the_shallowest_entry():
+    table = _single_bucket_table()
+    for key, depth in ((1, 8), (2, 2), (3, 5), (4, 6)):
+        table.store(key, depth, key, 'EXACT')
+    table.store(5, 1, 5, 'EXACT')
+    assert table.probe(2) is None
+    for key in (1, 3, 4, 5):
+        assert table.probe(key) is not None
+
+
+def test_stale_entries_are_evicted_before_deeper_current_ones():
+    table = _single_bucket_table()
+    table.store(1, 6, 1, 'EXACT')
+    for _ in range(3):
+        table.new_search()
+    for key in (2, 3, 4):
+        table.store(key, 4, key, 'EXACT')
+    # The depth-6 entry is three searches old, so it goes before any
+    # depth-4 entry of the current search
+    table.store(5, 3, 5, 'EXACT')
+    assert table.probe(1) is None
+    for key in (2, 3, 4, 5):
+        assert table.probe(key) is not None
+
+
+def test_store_replaces_the_entry_for_the_same_key():
+    table = _single_bucket_table()
+    table.store(7, 2, 10, 'LOWER')
+    table.store(7, 5, 20, 'EXACT')
+    assert table.probe(7)[:3] == (5, 20, 'EXACT')
+
+
+def test_quiescence_store_keeps_a_deeper_entry_for_the_same_key():
+    table = _single_bucket_table()
+    table.store(7, 5, 20, 'EXACT')
+    table.store(7, QSEARCH_DEPTH, -30, 'LOWER')
+    assert table.probe(7)[:3] == (5, 20, 'EXACT')
+
+
+def test_quiescence_store_does_not_evict_a_deeper_entry():
+    table = _single_bucket_table()
+    for key in (1, 2, 3, 4):
+        table.store(key, 3, key, 'EXACT')
+    table.store(5, QSEARCH_DEPTH, 5, 'EXACT')
+    assert table.probe(5) is None
+    for key in (1, 2, 3, 4):
+        assert table.probe(key) is not None
+
+
+def test_quiescence_store_replaces_a_quiescence_entry():
+    table = _single_bucket_table()
+    for key, depth in ((1, 3), (2, QSEARCH_DEPTH), (3, 3), (4, 3)):
+        table.store(key, depth, key, 'EXACT')
+    table.store(5, QSEARCH_DEPTH, 5, 'EXACT')
+    assert table.probe(2) is None
+    assert table.probe(5) is not None
+
+
+def test_snapshot_round_trip(tmp_path):
+    table = TranspositionTable(1)
+    table.new_search()
+    table.store(12345, 7, -42, 'LOWER')
+    table.store(67890, 3, 17, 'UPPER')
+    path = tmp_path / "tt.bin"
+    table.save(path)
+
+    loaded = TranspositionTable.load(path)
+    try:
+        assert loaded.buckets == table.buckets
+        assert loaded.generation == table.generation
+        assert loaded.probe(12345)[:3] == (7, -42, 'LOWER')
+        assert loaded.probe(67890)[:3] == (3, 17, 'UPPER')
+        # Copy-on-write: stores after loading do not reach the file
+        loaded.store(99, 1, 0, 'EXACT')
+    finally:
+        loaded.release()
+    reloaded = TranspositionTable.load(path)
+    try:
+        assert reloaded.probe(99) is None
+    finally:
+        reloaded.release()
+
+
+@pytest.mark.parametrize("version", ["ENGINE_VERSION", "EVAL_VERSION"])
+def test_snapshot_from_another_version_is_rejected(tmp_path, monkeypatch, version):
+    path = tmp_path / "tt.bin"
+    TranspositionTable(1).save(path)
+    monkeypatch.setattr(chess_bot, version, getattr(chess_bot, version) + 1)
+    with pytest.raises(ValueError):
+        TranspositionTable.load(path)
+
+    bot = ChessBot(hash_size_mb=1)
+    table = bot.transposition_table
+    assert not bot.load_transposition_table(path)
+    assert bot.transposition_table is table
+
+
+def test_truncated_snapshot_is_rejected(tmp_path):
+    path = tmp_path / "tt.bin"
+    TranspositionTable(1).save(path)
+    data = path.read_bytes()
+    path.write_bytes(data[:len(data) // 2])
+    with pytest.raises(ValueError, match="truncated"):
+        TranspositionTable.load(path)
+    path.write_bytes(data[:10])
+    with pytest.raises(ValueError):
+        TranspositionTable.load(path)